@@ -2,25 +2,103 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from typing import TYPE_CHECKING
+
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.typing import ConfigType
+
+from aidot.const import CONF_LOGIN_INFO
+
+from .cloud import DeviceListStore
+from .const import CONF_METRICS, DATA_WARM_CACHE, DOMAIN
+from .latency import LatencyTracker
+from .services import async_setup_services
+
+if TYPE_CHECKING:
+    from .coordinator import AidotConfigEntry
 
-from .coordinator import AidotConfigEntry, AidotDeviceManagerCoordinator
+_LOGGER = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SENSOR]
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the aidot integration."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: AidotConfigEntry) -> bool:
     """Set up aidot from a config entry."""
 
-    coordinator = AidotDeviceManagerCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    start = time.monotonic()
+    # The coordinator pulls in the cloud and device clients, discovery and
+    # the network component; it is imported in the executor on first setup
+    coordinator_module = await async_import_module(hass, f"{__package__}.coordinator")
+    coordinator = coordinator_module.AidotDeviceManagerCoordinator(hass, entry)
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # Release the shared discovery hub and any sessions opened so far
+        await coordinator.async_unload()
+        raise
     entry.runtime_data = coordinator
+    if entry.options.get(CONF_METRICS, False):
+        metrics = await async_import_module(hass, f"{__package__}.metrics")
+        metrics.async_register_metrics_view(hass)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Platforms only register entity factories; entities are added and
+    # removed for all platforms together whenever the device list changes
+    entry.async_on_unload(
+        coordinator.async_add_listener(coordinator.reconciler.async_reconcile)
+    )
+    coordinator.reconciler.async_reconcile()
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    coordinator.setup_duration = time.monotonic() - start
+    _LOGGER.info(
+        "Set up %d device(s) in %.2fs",
+        len(coordinator.device_coordinators),
+        coordinator.setup_duration,
+    )
     return True
 
 
+async def _async_update_listener(
+    hass: HomeAssistant, entry: AidotConfigEntry
+) -> None:
+    """Reload the entry when its options change.
+
+    Token refreshes and reauthentication only change its data, which is
+    adopted without a reload so local control is not interrupted.
+    """
+    coordinator = entry.runtime_data
+    if entry.options != coordinator.options:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.async_update_login_info(entry.data[CONF_LOGIN_INFO])
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: AidotConfigEntry) -> None:
+    """Remove the stored device list, latency history and circadian enrollments."""
+    # Written on unload for a reload, which a removed entry never gets
+    hass.data.get(DATA_WARM_CACHE, {}).pop(entry.entry_id, None)
+    await DeviceListStore(hass, entry.entry_id).async_remove()
+    await LatencyTracker(hass, entry.entry_id).async_remove()
+    circadian = await async_import_module(hass, f"{__package__}.circadian")
+    await circadian.async_remove_enrollments(hass, entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: AidotConfigEntry) -> bool:
     """Unload a config entry."""
-    entry.runtime_data.cleanup()
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, PLATFORMS
+    ):
+        await entry.runtime_data.async_unload()
+    return unload_ok
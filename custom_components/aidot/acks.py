@@ -0,0 +1,173 @@
+"""Acknowledgement tracking for commands sent to Aidot devices.
+
+Devices do not acknowledge setDevAttrReq frames directly; they answer with
+a status frame carrying their new attributes. Each command sent to a
+device is tracked until a status frame carries at least one of its
+attributes and every attribute it carries matches the command, within a
+tolerance for devices that clamp or round brightness and color
+temperature. Only the attributes in the frame itself count, not the
+device's cached state, so an unrelated frame cannot confirm a command.
+Frames on one session are handled in order, so a frame acknowledging a
+command acknowledges all commands sent before it, like a cumulative TCP
+ack. Up to ACK_WINDOW commands may be unacknowledged at once per session;
+a command without an ack within the device's adaptive status timeout
+counts as lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from aidot.const import CONF_CCT, CONF_DIMMING, CONF_ON_OFF, CONF_RGBW
+
+from .const import ACK_CCT_TOLERANCE, ACK_DIMMING_TOLERANCE, ACK_WINDOW
+from .profiling import CallsiteStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _confirms(frame: dict[str, Any], attrs: dict[str, Any]) -> bool:
+    """Return True if the attributes of a status frame confirm a command."""
+    matched = False
+    for key, value in attrs.items():
+        if (reported := frame.get(key)) is None:
+            continue
+        if key == CONF_ON_OFF:
+            equal = bool(reported) == bool(value)
+        elif key == CONF_DIMMING:
+            equal = abs(reported - value) <= ACK_DIMMING_TOLERANCE
+        elif key == CONF_CCT:
+            equal = abs(reported - value) <= ACK_CCT_TOLERANCE
+        elif key == CONF_RGBW:
+            # Sent unsigned, reported as a signed 32-bit integer by some models
+            equal = reported & 0xFFFFFFFF == value & 0xFFFFFFFF
+        else:
+            continue
+        if not equal:
+            return False
+        matched = True
+    return matched
+
+
+@dataclass(slots=True)
+class _PendingCommand:
+    """A command waiting for its acknowledgement."""
+
+    attrs: dict[str, Any]
+    sent: float
+    future: asyncio.Future[float | None]
+    expiry: asyncio.TimerHandle | None = None
+
+
+class CommandTracker:
+    """Match a device's status frames to the commands sent to it."""
+
+    def __init__(
+        self,
+        name: str,
+        rtt: CallsiteStats,
+        on_ack: Callable[[float], None],
+        on_lost: Callable[[], None],
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            name: Device ID used for logging
+            rtt: Statistics the ack latency of every command is recorded in
+            on_ack: Called with unambiguous round-trip times, for the
+                adaptive timeouts
+            on_lost: Called when a command was not acknowledged in time
+        """
+        self._name = name
+        self._rtt = rtt
+        self._on_ack = on_ack
+        self._on_lost = on_lost
+        self._pending: deque[_PendingCommand] = deque()
+        self.acked = 0
+        self.lost = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of unacknowledged commands."""
+        return len(self._pending)
+
+    async def async_wait_window(self) -> None:
+        """Wait until another command may be sent on the session."""
+        while len(self._pending) >= ACK_WINDOW:
+            # Resolved by an ack, by expiry or by cancel()
+            await asyncio.shield(self._pending[0].future)
+
+    def track(
+        self, attrs: dict[str, Any], timeout: float
+    ) -> asyncio.Future[float | None]:
+        """Start tracking a command about to be sent.
+
+        Returns a future resolved with the ack latency in seconds, or with
+        None if the command was not acknowledged within the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        command = _PendingCommand(dict(attrs), loop.time(), loop.create_future())
+        command.expiry = loop.call_later(timeout, self._expire, command)
+        self._pending.append(command)
+        return command.future
+
+    def discard(self, future: asyncio.Future[float | None]) -> None:
+        """Stop tracking a command that could not be sent."""
+        for command in self._pending:
+            if command.future is future:
+                self._pending.remove(command)
+                self._resolve(command, None)
+                return
+
+    def handle_frame(self, frame: dict[str, Any]) -> None:
+        """Acknowledge the commands a status frame confirms.
+
+        Args:
+            frame: The attributes carried by the frame, in device units
+        """
+        acked = 0
+        for index, command in enumerate(self._pending):
+            if _confirms(frame, command.attrs):
+                acked = index + 1
+        if not acked:
+            return
+        now = asyncio.get_running_loop().time()
+        for _ in range(acked):
+            command = self._pending.popleft()
+            rtt = now - command.sent
+            self._rtt.record(rtt)
+            self.acked += 1
+            self._resolve(command, rtt)
+        # Only the newest command is known to have caused this frame
+        self._on_ack(rtt)
+
+    def _expire(self, command: _PendingCommand) -> None:
+        """Give up on a command that was not acknowledged in time."""
+        command.expiry = None
+        try:
+            self._pending.remove(command)
+        except ValueError:
+            return
+        self.lost += 1
+        _LOGGER.debug("Device %s did not acknowledge %s", self._name, command.attrs)
+        self._on_lost()
+        self._resolve(command, None)
+
+    @staticmethod
+    def _resolve(command: _PendingCommand, rtt: float | None) -> None:
+        """Resolve a command's future and stop its expiry timer."""
+        if command.expiry is not None:
+            command.expiry.cancel()
+            command.expiry = None
+        if not command.future.done():
+            command.future.set_result(rtt)
+
+    def cancel(self) -> None:
+        """Stop tracking all commands."""
+        while self._pending:
+            self._resolve(self._pending.popleft(), None)
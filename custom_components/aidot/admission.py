@@ -0,0 +1,236 @@
+"""Connection admission control for Aidot devices.
+
+When the network recovers from an outage every bulb tends to reconnect at
+once, which overloads the access points and makes each login time out.
+The classes in this module detect such mass disconnects and pace the
+resulting login attempts until the installation has recovered.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import time
+
+from .const import (
+    STORM_DETECTION_WINDOW,
+    STORM_DISCONNECT_RATIO,
+    STORM_INITIAL_CONCURRENCY,
+    STORM_LOGIN_BURST,
+    STORM_LOGIN_RATE,
+    STORM_MAX_CONCURRENCY,
+    STORM_MIN_DEVICES,
+    STORM_RECOVERY_MAX_DURATION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last refill."""
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available without waiting."""
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def async_acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def reset(self) -> None:
+        """Refill the bucket to capacity."""
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+
+@dataclass(slots=True)
+class RecoveryReport:
+    """Summary of a completed storm recovery."""
+
+    duration: float
+    recovered: int
+    unrecovered: int
+    attempts: int
+    failures: int
+
+
+class ConnectionStormGuard:
+    """Detect mass disconnects and throttle reconnect logins during recovery.
+
+    In normal operation connection attempts are admitted immediately. Once
+    enough previously connected devices drop within a short window the guard
+    enters recovery mode: every login must take a token from a token bucket
+    and the number of concurrent logins follows an AIMD window that grows
+    with each success and halves on each failure.
+    """
+
+    def __init__(self, on_recovery_complete: Callable[[RecoveryReport], None]) -> None:
+        """Initialize the guard.
+
+        Args:
+            on_recovery_complete: Called once when a recovery period ends
+        """
+        self._on_recovery_complete = on_recovery_complete
+        self._bucket = TokenBucket(STORM_LOGIN_RATE, STORM_LOGIN_BURST)
+        self._disconnects: deque[tuple[float, str]] = deque()
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._window = float(STORM_MAX_CONCURRENCY)
+        self._connected = 0
+        self._recovery_started: float | None = None
+        self._pending: set[str] = set()
+        self._recovered: set[str] = set()
+        self._attempts = 0
+        self._failures = 0
+
+    @property
+    def recovering(self) -> bool:
+        """Return True while the guard is in recovery mode."""
+        return self._recovery_started is not None
+
+    @property
+    def concurrency(self) -> int:
+        """Return the current number of logins allowed in parallel."""
+        return max(1, int(self._window))
+
+    def update_connected(self, connected: int) -> None:
+        """Record the number of currently connected devices."""
+        if not self.recovering:
+            self._connected = connected
+
+    def record_disconnect(self, dev_id: str) -> None:
+        """Record that a previously connected device dropped off."""
+        now = time.monotonic()
+        if self.recovering:
+            self._pending.add(dev_id)
+            return
+
+        self._disconnects.append((now, dev_id))
+        while self._disconnects and now - self._disconnects[0][0] > STORM_DETECTION_WINDOW:
+            self._disconnects.popleft()
+
+        dropped = {dev for _, dev in self._disconnects}
+        threshold = max(STORM_MIN_DEVICES, self._connected * STORM_DISCONNECT_RATIO)
+        if len(dropped) >= threshold:
+            self._enter_recovery(now, dropped)
+
+    def _enter_recovery(self, now: float, dropped: set[str]) -> None:
+        """Switch into recovery mode."""
+        _LOGGER.warning(
+            "Connection storm detected: %d device(s) disconnected within %.0fs, "
+            "pacing reconnects",
+            len(dropped),
+            STORM_DETECTION_WINDOW,
+        )
+        self._recovery_started = now
+        self._pending = set(dropped)
+        self._recovered = set()
+        self._disconnects.clear()
+        self._window = float(STORM_INITIAL_CONCURRENCY)
+        self._attempts = 0
+        self._failures = 0
+        self._bucket.reset()
+
+    def _exit_recovery(self) -> None:
+        """Leave recovery mode and report how long it took."""
+        assert self._recovery_started is not None
+        report = RecoveryReport(
+            duration=time.monotonic() - self._recovery_started,
+            recovered=len(self._recovered),
+            unrecovered=len(self._pending),
+            attempts=self._attempts,
+            failures=self._failures,
+        )
+        self._recovery_started = None
+        self._pending = set()
+        self._recovered = set()
+        self._window = float(STORM_MAX_CONCURRENCY)
+        _LOGGER.info(
+            "Connection storm recovery finished after %.1fs "
+            "(%d recovered, %d still offline, %d attempts, %d failures)",
+            report.duration,
+            report.recovered,
+            report.unrecovered,
+            report.attempts,
+            report.failures,
+        )
+        self._on_recovery_complete(report)
+
+    def forget(self, dev_id: str) -> None:
+        """Stop tracking a device that was removed from the account."""
+        self._pending.discard(dev_id)
+        self._recovered.discard(dev_id)
+        if self.recovering and not self._pending:
+            self._exit_recovery()
+
+    def check_timeout(self) -> None:
+        """End a recovery period that has been running for too long."""
+        if (
+            self._recovery_started is not None
+            and time.monotonic() - self._recovery_started > STORM_RECOVERY_MAX_DURATION
+        ):
+            _LOGGER.warning(
+                "Connection storm recovery timed out with %d device(s) still offline",
+                len(self._pending),
+            )
+            self._exit_recovery()
+
+    async def async_acquire(self) -> None:
+        """Wait until a connection attempt may start."""
+        if not self.recovering:
+            self._in_flight += 1
+            return
+
+        await self._bucket.async_acquire()
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._in_flight < self.concurrency
+            )
+            self._in_flight += 1
+
+    async def async_release(self, dev_id: str, success: bool) -> None:
+        """Finish a connection attempt and adjust the concurrency window."""
+        self._in_flight -= 1
+        if self.recovering:
+            self._attempts += 1
+            if success:
+                self._window = min(
+                    STORM_MAX_CONCURRENCY, self._window + 1 / self._window
+                )
+                if dev_id in self._pending:
+                    self._pending.discard(dev_id)
+                    self._recovered.add(dev_id)
+            else:
+                self._failures += 1
+                self._window = max(1.0, self._window / 2)
+            if not self._pending:
+                self._exit_recovery()
+
+        async with self._condition:
+            self._condition.notify_all()
@@ -0,0 +1,331 @@
+"""Circadian color temperature and brightness for Aidot lights.
+
+Enrolled lights follow the sun. Once per CIRCADIAN_INTERVAL one target is
+computed for all of them from the solar elevation relative to today's
+solar noon. Each light quantizes it to its model's color temperature range
+and to steps a bulb renders visibly, and a frame is sent only to lights
+that are on and whose quantized target changed.
+
+A light whose status frames report a color temperature or brightness the
+scheduler did not send was changed by hand; it is paused until it is
+turned off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.sun import get_astral_location
+from homeassistant.util import dt as dt_util
+
+from aidot.const import CONF_CCT, CONF_DIMMING
+from aidot.device_client import DeviceInformation
+
+from .command_queue import CommandLane
+from .const import (
+    CIRCADIAN_BRIGHTNESS_STEP,
+    CIRCADIAN_INTERVAL,
+    CIRCADIAN_KELVIN_STEP,
+    CIRCADIAN_MAX_BRIGHTNESS,
+    CIRCADIAN_MAX_KELVIN,
+    CIRCADIAN_MIN_BRIGHTNESS,
+    CIRCADIAN_MIN_KELVIN,
+    CIRCADIAN_SETTLE_TIME,
+    DOMAIN,
+)
+from .scenes import LightState
+
+if TYPE_CHECKING:
+    from .coordinator import AidotDeviceUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the enrollment store of an entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.circadian")
+
+
+async def async_remove_enrollments(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored enrollments of a deleted entry."""
+    await _store(hass, entry_id).async_remove()
+
+
+def _shows(key: str, value: int, current: LightState) -> bool | None:
+    """Return True if a light shows a quantized attribute value.
+
+    Values within half a quantization step quantize to the same target,
+    which absorbs bulbs rounding color temperatures and brightness going
+    through python-aidot's 0-255 scale and back. Returns None if the light
+    has not reported the attribute.
+    """
+    if key == CONF_CCT:
+        actual, step = current.cct, CIRCADIAN_KELVIN_STEP
+    else:
+        actual, step = current.dimming, CIRCADIAN_BRIGHTNESS_STEP
+    if actual is None:
+        return None
+    return abs(actual - value) <= step / 2
+
+
+@dataclass(frozen=True, slots=True)
+class CircadianTarget:
+    """Color temperature and brightness for the current sun position."""
+
+    kelvin: float
+    brightness: float  # percent
+
+    def quantize(self, info: DeviceInformation, brightness: bool) -> dict[str, int]:
+        """Return the attributes a light renders for this target.
+
+        Args:
+            info: Information of the light's model
+            brightness: Include the brightness, not only the color temperature
+        """
+        attrs: dict[str, int] = {}
+        if info.enable_cct and hasattr(info, "cct_min") and hasattr(info, "cct_max"):
+            kelvin = min(max(self.kelvin, info.cct_min), info.cct_max)
+            steps = round((kelvin - info.cct_min) / CIRCADIAN_KELVIN_STEP)
+            attrs[CONF_CCT] = min(
+                info.cct_min + steps * CIRCADIAN_KELVIN_STEP, info.cct_max
+            )
+        if brightness and info.enable_dimming:
+            steps = round(self.brightness / CIRCADIAN_BRIGHTNESS_STEP)
+            attrs[CONF_DIMMING] = min(max(steps * CIRCADIAN_BRIGHTNESS_STEP, 1), 100)
+        return attrs
+
+
+@dataclass(slots=True)
+class _Enrollment:
+    """Circadian state of one light."""
+
+    brightness: bool
+    paused: bool = False
+    # Attributes last sent or found in place, None after the light was off
+    sent: dict[str, int] | None = None
+    sent_at: float = 0.0
+    coordinator: AidotDeviceUpdateCoordinator | None = None
+    unsub: CALLBACK_TYPE | None = None
+
+
+class CircadianScheduler:
+    """Keep enrolled lights on a sun-based color temperature curve."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        device_coordinators: dict[str, AidotDeviceUpdateCoordinator],
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            entry_id: The config entry ID, used for the enrollment store
+            device_coordinators: Live mapping of device IDs to coordinators
+        """
+        self.hass = hass
+        self._store = _store(hass, entry_id)
+        self._device_coordinators = device_coordinators
+        self._enrolled: dict[str, _Enrollment] = {}
+        self._unsub_tick: CALLBACK_TYPE | None = None
+        self._noon: tuple[date, float] | None = None
+        self.updates_sent = 0
+        self.updates_skipped = 0
+        self.overrides = 0
+
+    @property
+    def enrolled(self) -> int:
+        """Return the number of enrolled lights."""
+        return len(self._enrolled)
+
+    @property
+    def paused(self) -> int:
+        """Return the number of lights paused after a manual change."""
+        return sum(enrollment.paused for enrollment in self._enrolled.values())
+
+    async def async_load(self) -> None:
+        """Load the stored enrollments."""
+        if (data := await self._store.async_load()) is None:
+            return
+        for dev_id, options in data["devices"].items():
+            self._enrolled[dev_id] = _Enrollment(options["brightness"])
+
+    @callback
+    def async_start(self) -> None:
+        """Start the periodic updates."""
+        self._unsub_tick = async_track_time_interval(
+            self.hass, self._async_tick, timedelta(seconds=CIRCADIAN_INTERVAL)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the periodic updates and status tracking."""
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        for enrollment in self._enrolled.values():
+            self._unwatch(enrollment)
+
+    async def async_enroll(self, dev_ids: Iterable[str], brightness: bool) -> None:
+        """Enroll lights and bring them to the current target."""
+        dev_ids = list(dev_ids)
+        for dev_id in dev_ids:
+            if (enrollment := self._enrolled.pop(dev_id, None)) is not None:
+                self._unwatch(enrollment)
+            self._enrolled[dev_id] = _Enrollment(brightness)
+        self._async_save()
+        await self._async_update(dev_ids)
+
+    @callback
+    def async_unenroll(self, dev_ids: Iterable[str]) -> None:
+        """Stop adjusting lights."""
+        for dev_id in dev_ids:
+            if (enrollment := self._enrolled.pop(dev_id, None)) is not None:
+                self._unwatch(enrollment)
+        self._async_save()
+
+    @callback
+    def _async_save(self) -> None:
+        """Store the enrollments."""
+        self._store.async_delay_save(
+            lambda: {
+                "devices": {
+                    dev_id: {"brightness": enrollment.brightness}
+                    for dev_id, enrollment in self._enrolled.items()
+                }
+            }
+        )
+
+    def target(self, now: datetime) -> CircadianTarget:
+        """Return the target for a point in time.
+
+        Follows the solar elevation as a fraction of today's highest, so
+        the curve peaks at solar noon and stays at the minimum at night.
+        """
+        location, elevation = get_astral_location(self.hass)
+        today = now.date()
+        if self._noon is None or self._noon[0] != today:
+            noon = location.noon(today)
+            self._noon = (today, location.solar_elevation(noon, elevation))
+        noon_elevation = self._noon[1]
+        sun = location.solar_elevation(now, elevation)
+        fraction = (
+            min(max(sun / noon_elevation, 0.0), 1.0) if noon_elevation > 0 else 0.0
+        )
+        return CircadianTarget(
+            CIRCADIAN_MIN_KELVIN
+            + (CIRCADIAN_MAX_KELVIN - CIRCADIAN_MIN_KELVIN) * fraction,
+            CIRCADIAN_MIN_BRIGHTNESS
+            + (CIRCADIAN_MAX_BRIGHTNESS - CIRCADIAN_MIN_BRIGHTNESS) * fraction,
+        )
+
+    async def _async_tick(self, _now: datetime | None = None) -> None:
+        """Update all enrolled lights."""
+        if self._enrolled:
+            await self._async_update(list(self._enrolled))
+
+    async def _async_update(self, dev_ids: list[str]) -> None:
+        """Send the current target to lights whose quantized target changed."""
+        target = self.target(dt_util.now())
+        now = self.hass.loop.time()
+        sends = []
+        sending: list[_Enrollment] = []
+        for dev_id in dev_ids:
+            enrollment = self._enrolled.get(dev_id)
+            coordinator = self._device_coordinators.get(dev_id)
+            if enrollment is None or coordinator is None or not coordinator.available:
+                continue
+            self._watch(dev_id, enrollment, coordinator)
+            status = coordinator.device_client.status
+            if enrollment.paused or not status.on:
+                continue
+            attrs = target.quantize(
+                coordinator.device_client.info, enrollment.brightness
+            )
+            if attrs == enrollment.sent:
+                self.updates_skipped += 1
+                continue
+            current = LightState.from_status(status)
+            changed = {
+                key: value
+                for key, value in attrs.items()
+                if not _shows(key, value, current)
+            }
+            enrollment.sent = attrs
+            enrollment.sent_at = now
+            if not changed:
+                self.updates_skipped += 1
+                continue
+            sends.append(
+                coordinator.async_send_dev_attr(changed, CommandLane.BACKGROUND)
+            )
+            sending.append(enrollment)
+
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for enrollment, result in zip(sending, results, strict=True):
+            if isinstance(result, Exception):
+                # Try again on the next tick
+                enrollment.sent = None
+            else:
+                self.updates_sent += 1
+
+    @callback
+    def _watch(
+        self,
+        dev_id: str,
+        enrollment: _Enrollment,
+        coordinator: AidotDeviceUpdateCoordinator,
+    ) -> None:
+        """Follow the status frames of an enrolled light."""
+        if enrollment.coordinator is coordinator:
+            return
+        self._unwatch(enrollment)
+        enrollment.coordinator = coordinator
+        enrollment.unsub = coordinator.async_add_listener(
+            lambda: self._handle_status(dev_id)
+        )
+
+    @staticmethod
+    def _unwatch(enrollment: _Enrollment) -> None:
+        """Stop following a light's status frames."""
+        if enrollment.unsub is not None:
+            enrollment.unsub()
+        enrollment.unsub = None
+        enrollment.coordinator = None
+
+    @callback
+    def _handle_status(self, dev_id: str) -> None:
+        """Pause a light that was changed by hand, resume it once it is off."""
+        enrollment = self._enrolled.get(dev_id)
+        if enrollment is None or enrollment.coordinator is None:
+            return
+        status = enrollment.coordinator.device_client.status
+        if not status.on:
+            if enrollment.paused:
+                _LOGGER.debug("Light %s turned off, resuming circadian updates", dev_id)
+            enrollment.paused = False
+            enrollment.sent = None
+            return
+        sent = enrollment.sent
+        if (
+            enrollment.paused
+            or sent is None
+            or self.hass.loop.time() - enrollment.sent_at < CIRCADIAN_SETTLE_TIME
+        ):
+            return
+        current = LightState.from_status(status)
+        if any(_shows(key, value, current) is False for key, value in sent.items()):
+            _LOGGER.debug("Light %s changed by hand, pausing circadian updates", dev_id)
+            enrollment.paused = True
+            self.overrides += 1
@@ -0,0 +1,209 @@
+"""Cloud access helpers for the Aidot integration.
+
+Lights are controlled over the LAN; the cloud is only needed for the
+account token and the device list. Cloud calls go through a circuit
+breaker so an outage is probed at a slowly growing interval instead of on
+every refresh, and the last device list is stored so an entry can start
+and control its lights while the cloud is unreachable. Controlling a light
+locally needs its AES key and password, so those are cached in .storage
+along with the few other fields python-aidot reads.
+"""
+
+from __future__ import annotations
+
+import base64
+from enum import StrEnum
+import json
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from aidot.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_AES_KEY,
+    CONF_HARDWARE_VERSION,
+    CONF_ID,
+    CONF_MAC,
+    CONF_MODEL_ID,
+    CONF_NAME,
+    CONF_PASSWORD,
+    CONF_PRODUCT,
+    CONF_SERVICE_MODULES,
+    CONF_TYPE,
+)
+
+from .const import (
+    CLOUD_FAILURE_THRESHOLD,
+    CLOUD_PROBE_TIMEOUT,
+    CLOUD_RETRY_MAX,
+    CLOUD_RETRY_MIN,
+    DEVICE_LIST_SAVE_DELAY,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Device fields python-aidot reads to create a device client
+_STORED_FIELDS = (
+    CONF_ID,
+    CONF_TYPE,
+    CONF_NAME,
+    CONF_MAC,
+    CONF_MODEL_ID,
+    CONF_HARDWARE_VERSION,
+    CONF_AES_KEY,
+    CONF_PASSWORD,
+)
+
+
+class CircuitState(StrEnum):
+    """State of the cloud circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CloudCircuitBreaker:
+    """Stop calling the cloud after repeated failures.
+
+    After CLOUD_FAILURE_THRESHOLD consecutive failures the circuit opens
+    and calls are rejected. Once the open period has passed a single probe
+    call is let through: success closes the circuit, failure opens it again
+    for twice as long, up to CLOUD_RETRY_MAX. A probe that records neither
+    within CLOUD_PROBE_TIMEOUT, e.g. because it was cancelled, counts as a
+    failure.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the breaker."""
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self._open_for = CLOUD_RETRY_MIN
+        self._retry_at = 0.0
+        self._probe_deadline = 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next call is let through."""
+        if self.state is CircuitState.CLOSED:
+            return 0.0
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a cloud call may be made now."""
+        if self.state is CircuitState.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state is CircuitState.OPEN and now >= self._retry_at:
+            self.state = CircuitState.HALF_OPEN
+            self._probe_deadline = now + CLOUD_PROBE_TIMEOUT
+            return True
+        if self.state is CircuitState.HALF_OPEN and now >= self._probe_deadline:
+            _LOGGER.debug("AiDot cloud probe did not finish, reopening the circuit")
+            self.record_failure()
+        # Open, or a probe call is already in flight
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a call that reached the cloud."""
+        if self.state is not CircuitState.CLOSED:
+            _LOGGER.info("AiDot cloud reachable again")
+        self.reset()
+
+    def record_failure(self) -> None:
+        """Record a call that failed to reach the cloud."""
+        self.failures += 1
+        if (
+            self.state is CircuitState.HALF_OPEN
+            or self.failures >= CLOUD_FAILURE_THRESHOLD
+        ):
+            if self.state is CircuitState.CLOSED:
+                _LOGGER.warning(
+                    "AiDot cloud unreachable, pausing cloud calls for %.0fs; "
+                    "lights are still controlled locally",
+                    self._open_for,
+                )
+            self.state = CircuitState.OPEN
+            self.opened += 1
+            self._retry_at = time.monotonic() + self._open_for
+            self._open_for = min(CLOUD_RETRY_MAX, self._open_for * 2)
+
+    def reset(self) -> None:
+        """Close the circuit."""
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._open_for = CLOUD_RETRY_MIN
+
+
+def token_expiry(login_info: dict[str, Any]) -> float | None:
+    """Return the expiry of the access token as a UNIX timestamp.
+
+    The access token is a JWT; returns None if it is missing or its payload
+    has no expiry.
+    """
+    token = login_info.get(CONF_ACCESS_TOKEN)
+    if not isinstance(token, str) or token.count(".") != 2:
+        return None
+    payload = token.split(".")[1]
+    try:
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _stored_device(device: dict[str, Any]) -> dict[str, Any]:
+    """Return the fields of a device needed to control it locally."""
+    stored = {key: device[key] for key in _STORED_FIELDS if key in device}
+    if (modules := device.get(CONF_PRODUCT, {}).get(CONF_SERVICE_MODULES)) is not None:
+        # Color and color temperature support
+        stored[CONF_PRODUCT] = {CONF_SERVICE_MODULES: modules}
+    return stored
+
+
+class DeviceListStore:
+    """Last device list fetched from the cloud, for offline starts.
+
+    Only the fields needed for local control are stored, but they include
+    each device's AES key and password, in plain text like the entry's
+    login info.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.devices"
+        )
+        self._devices: list[dict[str, Any]] | None = None
+
+    async def async_load(self) -> list[dict[str, Any]] | None:
+        """Return the stored device list, if any."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        self._devices = data.get("devices")
+        return self._devices
+
+    def async_save(self, devices: list[dict[str, Any]]) -> None:
+        """Store the local control fields of a device list unless unchanged."""
+        devices = [_stored_device(device) for device in devices]
+        if devices == self._devices:
+            return
+        self._devices = devices
+        self._store.async_delay_save(
+            lambda: {"devices": devices}, DEVICE_LIST_SAVE_DELAY
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the stored device list."""
+        await self._store.async_remove()
@@ -0,0 +1,198 @@
+"""Per-device command queue with priority lanes.
+
+Every command for a device is sent over one TCP session. User taps,
+automations and background maintenance traffic all compete for that
+session, so commands are queued per device and always drained in lane
+order: interactive service calls first, then automations and scenes,
+then background traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandLane(IntEnum):
+    """Priority lane of a command, lower values are sent first."""
+
+    INTERACTIVE = 0
+    AUTOMATION = 1
+    BACKGROUND = 2
+
+
+@dataclass(slots=True)
+class LaneStats:
+    """Queue-wait statistics for one lane."""
+
+    sent: int = 0
+    superseded: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        """Record the time a command spent waiting in the queue."""
+        self.sent += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def mean_wait(self) -> float:
+        """Return the average queue-wait time."""
+        return self.total_wait / self.sent if self.sent else 0.0
+
+
+@dataclass(order=True, slots=True)
+class _QueuedCommand:
+    """A command waiting to be sent."""
+
+    lane: CommandLane
+    seq: int
+    attrs: dict[str, Any] = field(compare=False)
+    future: asyncio.Future[SendResult] = field(compare=False)
+    enqueued: float = field(compare=False)
+    # Attributes removed because a user command overwrote them
+    superseded: set[str] = field(default_factory=set, compare=False)
+
+
+@dataclass(frozen=True, slots=True)
+class SendResult:
+    """Outcome of a queued command."""
+
+    # Return value of the send function, None if nothing was sent
+    value: Any = None
+    # Attributes not sent because a user command overwrote them
+    superseded: frozenset[str] = frozenset()
+
+
+class DeviceCommandQueue:
+    """Send queue for one device session."""
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            name: Device ID used for logging
+            send: Coroutine function that sends attributes to the device,
+                its result is returned to the caller of async_send()
+        """
+        self._name = name
+        self._send = send
+        self._heap: list[_QueuedCommand] = []
+        self._seq = itertools.count()
+        self._drain_task: asyncio.Task[None] | None = None
+        self.lane_stats: dict[CommandLane, LaneStats] = {
+            lane: LaneStats() for lane in CommandLane
+        }
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._heap)
+
+    async def async_send(
+        self, attrs: dict[str, Any], lane: CommandLane = CommandLane.AUTOMATION
+    ) -> SendResult:
+        """Queue attributes for the device and wait until they are sent.
+
+        Empty attributes request the device status instead. Attributes a
+        user command overwrites while this one is queued are not sent; the
+        result lists them next to the return value of the send function.
+        """
+        loop = asyncio.get_running_loop()
+        if lane is CommandLane.INTERACTIVE:
+            self._supersede(attrs)
+
+        command = _QueuedCommand(
+            lane, next(self._seq), dict(attrs), loop.create_future(), loop.time()
+        )
+        heapq.heappush(self._heap, command)
+        if self._drain_task is None:
+            self._drain_task = loop.create_task(
+                self._async_drain(), name=f"{self._name} command queue"
+            )
+        return await command.future
+
+    def _supersede(self, attrs: dict[str, Any]) -> None:
+        """Drop queued lower-priority attributes overwritten by a user command.
+
+        A queued background or automation frame that only sets attributes the
+        user is about to change would be sent just to be overwritten.
+        """
+        superseded = False
+        for command in self._heap:
+            if command.lane is CommandLane.INTERACTIVE:
+                continue
+            if not (overlap := attrs.keys() & command.attrs.keys()):
+                # Includes status requests, which carry no attributes
+                continue
+            for key in overlap:
+                del command.attrs[key]
+            command.superseded |= overlap
+            if not command.attrs and not command.future.done():
+                command.future.set_result(SendResult(None, frozenset(overlap)))
+                self.lane_stats[command.lane].superseded += 1
+                superseded = True
+        if superseded:
+            self._heap = [
+                command for command in self._heap if not command.future.done()
+            ]
+            heapq.heapify(self._heap)
+
+    async def _async_drain(self) -> None:
+        """Send queued commands one at a time in lane order."""
+        loop = asyncio.get_running_loop()
+        command: _QueuedCommand | None = None
+        try:
+            while self._heap:
+                command = heapq.heappop(self._heap)
+                if command.future.done():
+                    continue
+                self.lane_stats[command.lane].record_wait(
+                    loop.time() - command.enqueued
+                )
+                try:
+                    result = await self._send(command.attrs)
+                except Exception as err:  # noqa: BLE001
+                    if not command.future.done():
+                        command.future.set_exception(err)
+                else:
+                    if not command.future.done():
+                        command.future.set_result(
+                            SendResult(result, frozenset(command.superseded))
+                        )
+        except BaseException:
+            # Cancelled while sending, e.g. on unload: nothing else is sent
+            if command is not None and not command.future.done():
+                command.future.set_exception(ConnectionError("Command cancelled"))
+            self._fail_queued("Command cancelled")
+            raise
+        finally:
+            if self._drain_task is asyncio.current_task():
+                self._drain_task = None
+
+    def _fail_queued(self, reason: str) -> None:
+        """Fail all queued commands."""
+        for command in self._heap:
+            if not command.future.done():
+                command.future.set_exception(ConnectionError(reason))
+        self._heap.clear()
+
+    def cancel(self) -> None:
+        """Fail all queued commands and stop sending."""
+        self._fail_queued("Device removed")
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
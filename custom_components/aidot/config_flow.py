@@ -3,21 +3,48 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Mapping
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_COUNTRY_CODE, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.importlib import async_import_module
 
-from aidot.client import AidotClient
 from aidot.const import CONF_LOGIN_INFO, DEFAULT_COUNTRY_CODE, SUPPORTED_COUNTRY_CODES
 from aidot.exceptions import AidotUserOrPassIncorrect
 
-from .const import DOMAIN
+from .const import (
+    CONF_ADMISSION_GROUPING,
+    CONF_IDLE_TIMEOUT,
+    CONF_LAZY_CONNECTIONS,
+    CONF_MAX_SESSIONS,
+    CONF_METRICS,
+    CONF_POLL_CONCURRENCY,
+    CONF_POLL_INTERVAL,
+    CONF_PROFILING,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_ADMISSION_GROUPING,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_SESSIONS,
+    DEFAULT_POLL_CONCURRENCY,
+    DEFAULT_POLL_INTERVAL,
+    DOMAIN,
+)
+from .topology import AdmissionGrouping
+
+if TYPE_CHECKING:
+    from aidot.client import AidotClient
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,34 +63,61 @@ DATA_SCHEMA = vol.Schema(
     }
 )
 
+REAUTH_SCHEMA = vol.Schema({vol.Required(CONF_PASSWORD): str})
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_LAZY_CONNECTIONS, default=False): bool,
+        vol.Required(CONF_IDLE_TIMEOUT, default=DEFAULT_IDLE_TIMEOUT): vol.All(
+            vol.Coerce(int), vol.Range(min=10)
+        ),
+        vol.Required(CONF_MAX_SESSIONS, default=DEFAULT_MAX_SESSIONS): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+        vol.Required(CONF_POLL_INTERVAL, default=DEFAULT_POLL_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+        vol.Required(
+            CONF_POLL_CONCURRENCY, default=DEFAULT_POLL_CONCURRENCY
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(CONF_PROFILING, default=False): bool,
+        vol.Required(CONF_METRICS, default=False): bool,
+        vol.Required(CONF_RECORD_TRAFFIC, default=False): bool,
+        vol.Required(
+            CONF_ADMISSION_GROUPING, default=DEFAULT_ADMISSION_GROUPING
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[grouping.value for grouping in AdmissionGrouping],
+                translation_key=CONF_ADMISSION_GROUPING,
+            )
+        ),
+    }
+)
+
 
 class AidotConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle aidot config flow."""
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> AidotOptionsFlow:
+        """Get the options flow for this handler."""
+        return AidotOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
-            client = AidotClient(
-                session=async_get_clientsession(self.hass),
+            client = await self._async_client(
                 country_code=user_input[CONF_COUNTRY_CODE],
                 username=user_input[CONF_USERNAME],
                 password=user_input[CONF_PASSWORD],
             )
             await self.async_set_unique_id(client.get_identifier())
             self._abort_if_unique_id_configured()
-            try:
-                login_info = await client.async_post_login()
-            except AidotUserOrPassIncorrect:
-                errors["base"] = "invalid_auth"
-            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
-                _LOGGER.error("Network error during login: %s", err)
-                errors["base"] = "cannot_connect"
-            except Exception:
-                _LOGGER.exception("Unexpected error during login")
-                errors["base"] = "unknown"
+            login_info = await self._async_login(client, errors)
 
             if not errors:
                 return self.async_create_entry(
@@ -76,3 +130,88 @@ class AidotConfigFlow(ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
+
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """Handle rejected credentials."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for the new password of the account.
+
+        The entry stays loaded and keeps controlling its lights locally; it
+        adopts the new login info without a reload.
+        """
+        errors: dict[str, str] = {}
+        entry = self._get_reauth_entry()
+        if user_input is not None:
+            client = await self._async_client(
+                token=entry.data[CONF_LOGIN_INFO],
+            )
+            client.update_password(user_input[CONF_PASSWORD])
+            await self.async_set_unique_id(client.get_identifier())
+            self._abort_if_unique_id_mismatch(reason="wrong_account")
+            login_info = await self._async_login(client, errors)
+
+            if not errors:
+                self.hass.config_entries.async_update_entry(
+                    entry, data={CONF_LOGIN_INFO: login_info}
+                )
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=REAUTH_SCHEMA,
+            description_placeholders={
+                CONF_USERNAME: entry.data[CONF_LOGIN_INFO][CONF_USERNAME]
+            },
+            errors=errors,
+        )
+
+    async def _async_client(self, **kwargs: Any) -> AidotClient:
+        """Create a cloud client.
+
+        python-aidot's client pulls in its RSA and HTTP dependencies, so it
+        is imported in the executor the first time a flow needs it.
+        """
+        client_module = await async_import_module(self.hass, "aidot.client")
+        return client_module.AidotClient(
+            session=async_get_clientsession(self.hass), **kwargs
+        )
+
+    async def _async_login(
+        self, client: AidotClient, errors: dict[str, str]
+    ) -> dict[str, Any]:
+        """Log in to the cloud, adding any error to errors."""
+        try:
+            return await client.async_post_login()
+        except AidotUserOrPassIncorrect:
+            errors["base"] = "invalid_auth"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.error("Network error during login: %s", err)
+            errors["base"] = "cannot_connect"
+        except Exception:
+            _LOGGER.exception("Unexpected error during login")
+            errors["base"] = "unknown"
+        return {}
+
+
+class AidotOptionsFlow(OptionsFlow):
+    """Handle aidot options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
@@ -2,20 +2,127 @@
 
 DOMAIN = "aidot"
 
+# Options
+CONF_LAZY_CONNECTIONS = "lazy_connections"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_MAX_SESSIONS = "max_sessions"
+CONF_POLL_INTERVAL = "poll_interval"
+CONF_POLL_CONCURRENCY = "poll_concurrency"
+CONF_PROFILING = "profiling"
+CONF_METRICS = "metrics"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_ADMISSION_GROUPING = "admission_grouping"
+
+DEFAULT_IDLE_TIMEOUT = 300  # seconds before an unused session is closed
+DEFAULT_MAX_SESSIONS = 0  # maximum open sessions in lazy mode, 0 for no limit
+DEFAULT_POLL_INTERVAL = 0  # seconds between status polls per device, 0 disables
+DEFAULT_POLL_CONCURRENCY = 4  # maximum outstanding status polls
+DEFAULT_ADMISSION_GROUPING = "none"  # per-group admission control is off
+
 # Discovery settings
 DISCOVERY_INITIAL_DELAY = 1.0  # seconds to wait for initial discovery responses
 DISCOVERY_STARTUP_BURST_COUNT = 3  # number of rapid discovery broadcasts at startup
 DISCOVERY_STARTUP_BURST_INTERVAL = 1.0  # seconds between startup burst broadcasts
+DISCOVERY_REPEAT_INTERVAL = 5.0  # seconds between periodic discovery broadcasts
+DISCOVERY_BROADCAST_COALESCE = 0.5  # broadcasts requested within this window are merged
+DISCOVERY_DEDUP_WINDOW = 30.0  # seconds a repeated reply with an unchanged IP is dropped
+DISCOVERY_BATCH_DELAY = 0.1  # seconds replies are collected before entries are notified
 
 # Command retry settings
 COMMAND_MAX_RETRIES = 2  # number of retries after initial attempt
 COMMAND_RETRY_BASE_DELAY = 1.0  # seconds to wait before first retry
 COMMAND_RETRY_BACKOFF_FACTOR = 1.5  # exponential backoff multiplier
+ACK_WINDOW = 4  # commands a device may leave unacknowledged before sends wait
+ACK_DIMMING_TOLERANCE = 2  # percent a confirmed brightness may differ from the command
+ACK_CCT_TOLERANCE = 100  # kelvin a confirmed color temperature may be off by
 
 # Connection settings
 RECONNECT_INTERVAL = 30.0  # seconds between reconnection attempts
 CONNECTION_TIMEOUT = 5.0  # seconds to wait for connection attempt
 STATUS_WAIT_TIMEOUT = 3.0  # seconds to wait for initial status after connection
 
+# Adaptive timeouts (CONNECTION_TIMEOUT/STATUS_WAIT_TIMEOUT seed new devices)
+LATENCY_MIN_TIMEOUT = 1.0  # lower bound for any adaptive timeout
+LATENCY_MAX_TIMEOUT = 15.0  # upper bound for any adaptive timeout
+LATENCY_MAX_BACKOFF = 4.0  # maximum timeout multiplier after repeated timeouts
+LATENCY_SAVE_DELAY = 60.0  # seconds to batch latency history writes
+
+# Lazy sessions
+SESSION_SWEEP_MIN_INTERVAL = 5.0  # minimum seconds between idle session sweeps
+
+# Status polling
+POLL_LAG_THRESHOLD = 0.1  # event-loop lag in seconds that slows polling down
+POLL_MAX_STRETCH = 4.0  # maximum factor by which a poll cycle is stretched
+
+# Profiling
+LAG_SAMPLE_INTERVAL = 1.0  # seconds between event-loop lag samples
+PROFILE_DEFAULT_DURATION = 30  # seconds profiled by the profile action
+PROFILE_TOP_FUNCTIONS = 25  # functions returned by the profile action
+
+# Metrics
+METRICS_URL = "/api/aidot/metrics"  # Prometheus scrape endpoint
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"  # hass.data flag, set once the view is registered
+
+# AES measurement and discovery reply offloading
+CRYPTO_WINDOW = 1.0  # seconds over which event loop AES load is measured
+CRYPTO_CIPHER_CACHE_SIZE = 64  # AES ciphers, i.e. device keys, kept for reuse
+CRYPTO_OFFLOAD_THRESHOLD = 0.05  # share of loop time spent on discovery replies that starts offloading
+CRYPTO_OFFLOAD_WORKERS = 2  # threads decrypting discovery replies
+CRYPTO_MAX_BATCH = 64  # discovery replies decrypted per executor job
+CRYPTO_MAX_PENDING = 1024  # queued discovery replies before new ones are dropped
+
+# Traffic recording
+RECORD_FLUSH_INTERVAL = 5.0  # seconds between writes of buffered traffic events
+RECORD_MAX_BYTES = 10 * 1024 * 1024  # size at which a traffic log is rotated
+RECORD_BACKUP_COUNT = 5  # rotated traffic logs to keep
+
+# Admission control per device group
+ADMISSION_SUBNET_PREFIX = 24  # prefix length devices are grouped by in subnet mode
+ADMISSION_GROUP_CONCURRENCY = 8  # logins and commands in flight per group
+ADMISSION_GROUP_RATE = 20.0  # logins and commands started per second per group
+ADMISSION_GROUP_BURST = 20  # logins and commands a group may start at once after idling
+
+# Circadian lighting
+CIRCADIAN_INTERVAL = 60.0  # seconds between circadian updates
+CIRCADIAN_MIN_KELVIN = 2200  # color temperature with the sun below the horizon
+CIRCADIAN_MAX_KELVIN = 5500  # color temperature with the sun at its highest
+CIRCADIAN_MIN_BRIGHTNESS = 30  # brightness in percent with the sun below the horizon
+CIRCADIAN_MAX_BRIGHTNESS = 100  # brightness in percent with the sun at its highest
+CIRCADIAN_KELVIN_STEP = 100  # smallest color temperature change sent to a light
+CIRCADIAN_BRIGHTNESS_STEP = 5  # smallest brightness change in percent sent to a light
+CIRCADIAN_SETTLE_TIME = 10.0  # seconds after a send before status differences count as overrides
+
+# Services
+SERVICE_PROFILE = "profile"
+SERVICE_SNAPSHOT = "snapshot"
+SERVICE_RESTORE = "restore"
+SERVICE_CIRCADIAN_ENROLL = "circadian_enroll"
+SERVICE_CIRCADIAN_UNENROLL = "circadian_unenroll"
+
+# Unload and reload
+UNLOAD_TIMEOUT = 5.0  # seconds to wait for device sessions to close
+WARM_CACHE_MAX_AGE = 300.0  # seconds a warm device cache stays valid for a reload
+DATA_WARM_CACHE = f"{DOMAIN}_warm_cache"  # hass.data key for warm device caches
+
+# Cloud access
+CLOUD_FAILURE_THRESHOLD = 3  # consecutive cloud failures before cloud calls pause
+CLOUD_RETRY_MIN = 60.0  # seconds cloud calls pause after the threshold is reached
+CLOUD_RETRY_MAX = 3600.0  # upper bound for the pause after repeated failures
+CLOUD_PROBE_TIMEOUT = 120.0  # seconds a probe call may take before it counts as failed
+TOKEN_REFRESH_MARGIN = 3600.0  # seconds before token expiry to refresh it
+TOKEN_REFRESH_INTERVAL = 43200.0  # seconds between refreshes if the expiry is unknown
+DEVICE_LIST_SAVE_DELAY = 10.0  # seconds to batch device list writes
+
 # Update intervals
 UPDATE_DEVICE_LIST_INTERVAL_HOURS = 6  # hours between device list refreshes
+
+# Connection storm protection
+STORM_DETECTION_WINDOW = 30.0  # seconds in which disconnects count towards a storm
+STORM_DISCONNECT_RATIO = 0.5  # fraction of connected devices that must drop
+STORM_MIN_DEVICES = 5  # minimum number of dropped devices to call it a storm
+STORM_LOGIN_RATE = 2.0  # login attempts admitted per second during recovery
+STORM_LOGIN_BURST = 4  # token bucket capacity during recovery
+STORM_INITIAL_CONCURRENCY = 2  # parallel logins when recovery starts
+STORM_MAX_CONCURRENCY = 32  # upper bound for parallel logins
+STORM_RECOVERY_MAX_DURATION = 600.0  # seconds before giving up on recovery
+EVENT_RECOVERY_COMPLETE = "aidot_recovery_complete"
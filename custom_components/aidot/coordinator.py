@@ -1,17 +1,21 @@
 """Coordinator for Aidot."""
 
 import asyncio
+import copy
 import logging
+import time
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Any
 
-from homeassistant.components.network import async_get_source_ip
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryError
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
 
 from aidot.client import AidotClient
 from aidot.const import (
@@ -23,20 +27,67 @@ from aidot.const import (
     CONF_TYPE,
 )
 from aidot.device_client import DeviceClient, DeviceStatusData
-from aidot.discover import Discover
 from aidot.exceptions import AidotAuthFailed, AidotUserOrPassIncorrect
 
+from .acks import CommandTracker
+from .admission import ConnectionStormGuard, RecoveryReport
+from .circadian import CircadianScheduler
+from .cloud import CloudCircuitBreaker, DeviceListStore, token_expiry
+from .command_queue import CommandLane, DeviceCommandQueue
 from .const import (
-    CONNECTION_TIMEOUT,
     DISCOVERY_INITIAL_DELAY,
     DISCOVERY_STARTUP_BURST_COUNT,
     DISCOVERY_STARTUP_BURST_INTERVAL,
+    CONF_ADMISSION_GROUPING,
+    CONF_IDLE_TIMEOUT,
+    CONF_LAZY_CONNECTIONS,
+    CONF_MAX_SESSIONS,
+    CONF_POLL_CONCURRENCY,
+    CONF_POLL_INTERVAL,
+    CONF_PROFILING,
+    CONF_RECORD_TRAFFIC,
+    CLOUD_RETRY_MIN,
+    DATA_WARM_CACHE,
+    DEFAULT_ADMISSION_GROUPING,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_SESSIONS,
+    DEFAULT_POLL_CONCURRENCY,
     DOMAIN,
-    RECONNECT_INTERVAL,
-    STATUS_WAIT_TIMEOUT,
+    EVENT_RECOVERY_COMPLETE,
+    TOKEN_REFRESH_INTERVAL,
+    TOKEN_REFRESH_MARGIN,
+    UNLOAD_TIMEOUT,
     UPDATE_DEVICE_LIST_INTERVAL_HOURS,
+    WARM_CACHE_MAX_AGE,
+)
+from .device_wrapper import DeviceClientWrapper
+from .discovery import (
+    AidotDiscoveryHub,
+    async_get_discovery_hub,
+    async_release_discovery_hub,
+)
+from .latency import DeviceLatency, LatencyTracker
+from .polling import StatusPoller
+from .profiling import CallsiteStats, HotPathProfiler, profiled
+from .reconcile import EntityReconciler
+from .recorder import (
+    EVENT_COMMAND,
+    EVENT_CONNECT,
+    EVENT_DEVICES,
+    EVENT_DISCONNECT,
+    EVENT_DISCOVERY,
+    EVENT_STATUS,
+    TrafficRecorder,
+    redact_devices,
+)
+from .sessions import SessionPool
+from .topology import (
+    OPERATION_COMMAND,
+    OPERATION_LOGIN,
+    OPERATION_STATUS,
+    AdmissionGrouping,
+    TopologyAdmission,
 )
-from .device_wrapper import DeviceClientWrapper, DiscoverWrapper
 
 type AidotConfigEntry = ConfigEntry[AidotDeviceManagerCoordinator]
 _LOGGER = logging.getLogger(__name__)
@@ -44,52 +95,19 @@ _LOGGER = logging.getLogger(__name__)
 UPDATE_DEVICE_LIST_INTERVAL = timedelta(hours=UPDATE_DEVICE_LIST_INTERVAL_HOURS)
 
 
-async def _patch_discover_with_source_ip(
-    discover: Discover, source_ip: str | None
-) -> None:
-    """Patch the Discover object to use the correct network interface.
-
-    Replaces the default try_create_broadcast method to bind to the
-    specific source IP instead of 0.0.0.0.
-    """
-    if source_ip is None:
-        return
-
-    original_try_create_broadcast = discover.try_create_broadcast
+@dataclass(slots=True)
+class AidotWarmCache:
+    """Device state handed over from an unloading entry to its reload."""
 
-    async def patched_try_create_broadcast():
-        """Create broadcast endpoint bound to specific interface."""
-        if discover._broadcast_protocol is None:
-            from aidot.discover import BroadcastProtocol
-
-            try:
-                (
-                    transport,
-                    protocol,
-                ) = await asyncio.get_event_loop().create_datagram_endpoint(
-                    lambda: BroadcastProtocol(
-                        discover._discover_callback, discover._login_info[CONF_ID]
-                    ),
-                    local_addr=(source_ip, 0),  # Bind to specific IP instead of 0.0.0.0
-                )
-                # Store the protocol instance that was actually created and connected
-                discover._broadcast_protocol = protocol
-                # Store transport for cleanup
-                discover._transport = transport
-                _LOGGER.info(
-                    "Discovery bound to %s (will send broadcasts from this address)",
-                    source_ip,
-                )
-            except OSError as e:
-                _LOGGER.error(
-                    "Failed to bind discovery to %s: %s. Falling back to default.",
-                    source_ip,
-                    e,
-                )
-                # Fall back to original implementation
-                await original_try_create_broadcast()
+    created: float
+    devices: list[dict[str, Any]]
+    ip_addresses: dict[str, str]
+    statuses: dict[str, DeviceStatusData]
 
-    discover.try_create_broadcast = patched_try_create_broadcast
+    @property
+    def fresh(self) -> bool:
+        """Return True if the cache is recent enough to skip a cold start."""
+        return time.monotonic() - self.created < WARM_CACHE_MAX_AGE
 
 
 class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
@@ -100,6 +118,11 @@ class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
         hass: HomeAssistant,
         config_entry: AidotConfigEntry,
         device_client: DeviceClient,
+        latency: DeviceLatency,
+        profiler: HotPathProfiler,
+        session_pool: SessionPool | None = None,
+        recorder: TrafficRecorder | None = None,
+        admission: TopologyAdmission | None = None,
     ) -> None:
         """Initialize coordinator."""
         super().__init__(
@@ -110,19 +133,74 @@ class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
             update_interval=None,
         )
         self.device_client = device_client
+        self.latency = latency
+        self.profiler = profiler
+        self.session_pool = session_pool
+        self.recorder = recorder
+        self.admission = admission
+        self.commands = DeviceCommandQueue(
+            device_client.device_id, self._async_send_now
+        )
         self._initial_status_received = False
+        # Event loop time of the last status frame, replaced after each frame
+        self.last_status_time = 0.0
+        self._status_event = asyncio.Event()
+        # Event loop time the last status request was sent
+        self._status_requested = 0.0
+        # Event loop time of the last frame not answering a status request
+        self.last_push_time = 0.0
+        self._status_reply_pending = False
+        self.status_frames = 0
+        # Time from sending a command to the status frame confirming it
+        self.command_rtt = CallsiteStats()
+        self.acks = CommandTracker(
+            device_client.device_id,
+            self.command_rtt,
+            latency.status.add_sample,
+            latency.status.record_timeout,
+        )
 
     async def _async_setup(self) -> None:
         """Set up the coordinator."""
         self.device_client.set_status_fresh_cb(self._handle_status_update)
+        DeviceClientWrapper(self.device_client).set_frame_cb(self.acks.handle_frame)
 
+    @profiled("status_update")
     def _handle_status_update(self, status: DeviceStatusData) -> None:
         """Handle status callback from device."""
+        self.status_frames += 1
         self._initial_status_received = True
+        self.last_status_time = self.hass.loop.time()
+        if self._status_reply_pending:
+            self._status_reply_pending = False
+        else:
+            self.last_push_time = self.last_status_time
+        self._status_event.set()
+        self._status_event = asyncio.Event()
+        if self.session_pool is not None:
+            # Pushed status counts as use, the session is not idle
+            self.session_pool.async_touch(self.device_client.device_id)
+        if self.recorder is not None:
+            self.recorder.record(
+                EVENT_STATUS,
+                self.device_client.device_id,
+                [status.online, status.on, status.dimming, status.cct, status.rgdb],
+            )
         self.async_set_updated_data(status)
 
+    @callback
+    @profiled("entity_state_write")
+    def async_update_listeners(self) -> None:
+        """Update all registered entities."""
+        super().async_update_listeners()
+
     async def _async_update_data(self) -> DeviceStatusData:
         """Return current status."""
+        if self.session_pool is not None:
+            # Lazy mode: logging in requests a fresh status from the device
+            dev_id = self.device_client.device_id
+            if await self.session_pool.async_acquire(dev_id):
+                self.session_pool.async_release(dev_id)
         return self.device_client.status
 
     @property
@@ -133,6 +211,20 @@ class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
             and self.device_client.status.online
         )
 
+    @property
+    def available(self) -> bool:
+        """Check if the device can be controlled.
+
+        In lazy connection mode a device without an open session is still
+        available as long as its IP address is known.
+        """
+        if self.is_connected:
+            return True
+        return (
+            self.session_pool is not None
+            and DeviceClientWrapper(self.device_client).ip_address is not None
+        )
+
     async def async_connect_and_wait_for_status(self) -> bool:
         """Attempt connection and wait for initial status.
 
@@ -155,16 +247,27 @@ class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
                 self._initial_status_received = True
             return True
 
+        loop = asyncio.get_running_loop()
+        # Replaced after every frame; taken before logging in so a status
+        # frame arriving while the login finishes is not missed
+        status_event = self._status_event
+
         # Attempt connection if not already connected
         if not self.device_client.connect_and_login:
+            login_timeout = self.latency.login.timeout
+            start_time = loop.time()
+            # The login ends with a status request
+            self._status_reply_pending = True
             try:
                 await asyncio.wait_for(
                     self.device_client.async_login(),
-                    timeout=CONNECTION_TIMEOUT,
+                    timeout=login_timeout,
                 )
             except asyncio.TimeoutError:
+                self.latency.login.record_timeout()
                 _LOGGER.debug(
-                    "Connection timeout for device %s at %s",
+                    "Connection timeout (%.1fs) for device %s at %s",
+                    login_timeout,
                     self.device_client.device_id,
                     wrapper.ip_address,
                 )
@@ -176,34 +279,143 @@ class AidotDeviceUpdateCoordinator(DataUpdateCoordinator[DeviceStatusData]):
                     e,
                 )
                 return False
-
-        # Wait for initial status
-        start_time = asyncio.get_event_loop().time()
-        while asyncio.get_event_loop().time() - start_time < STATUS_WAIT_TIMEOUT:
-            # Check if callback was triggered
-            if self._initial_status_received and self.device_client.status.online:
-                return True
-            
-            # Also check if device has valid status even without callback
-            # (handles case where status arrived before callback was registered)
-            if self.device_client.connect_and_login and self.device_client.status.online:
+            if not self.device_client.connect_and_login:
+                # python-aidot logs login errors and returns
                 _LOGGER.debug(
-                    "Device %s has valid status without callback trigger, marking as received",
-                    self.device_client.device_id,
+                    "Login failed for device %s", self.device_client.device_id
                 )
-                self._initial_status_received = True
-                return True
-            
-            await asyncio.sleep(0.25)
+                return False
+            self.latency.login.add_sample(loop.time() - start_time)
 
-        _LOGGER.debug(
-            "Status timeout for device %s (connected=%s, online=%s, initial_received=%s)",
-            self.device_client.device_id,
-            self.device_client.connect_and_login,
-            self.device_client.status.online,
-            self._initial_status_received,
-        )
-        return False
+        # A successful login ends by requesting the status, wait for the
+        # frame answering it
+        status_timeout = self.latency.status.timeout
+        requested = loop.time()
+        try:
+            await asyncio.wait_for(status_event.wait(), timeout=status_timeout)
+        except asyncio.TimeoutError:
+            self.latency.status.record_timeout()
+            _LOGGER.debug(
+                "Status timeout (%.1fs) for device %s (connected=%s, online=%s)",
+                status_timeout,
+                self.device_client.device_id,
+                self.device_client.connect_and_login,
+                self.device_client.status.online,
+            )
+            return False
+        if self.last_status_time >= requested:
+            # Frames that beat the end of the login give no usable sample
+            self.latency.status.add_sample(self.last_status_time - requested)
+        return self.is_connected
+
+    async def async_send_dev_attr(
+        self,
+        attrs: dict[str, Any],
+        lane: CommandLane = CommandLane.AUTOMATION,
+        wait_for_ack: bool = False,
+    ) -> frozenset[str]:
+        """Queue attributes for the device in the given priority lane.
+
+        Raises ConnectionError if the device is offline or the send times out.
+        With wait_for_ack, also waits until a status frame confirms the
+        attributes or the adaptive timeout passes; an unconfirmed command is
+        counted as lost, and entities keep their optimistic state.
+
+        Returns the attributes that were not sent because a user command
+        overwrote them while this one was queued.
+        """
+        if self.recorder is not None:
+            self.recorder.record(
+                EVENT_COMMAND, self.device_client.device_id, [attrs, lane.value]
+            )
+        result = await self.commands.async_send(attrs, lane)
+        if result.superseded:
+            _LOGGER.debug(
+                "Device %s: %s overwritten by a user command before sending",
+                self.device_client.device_id,
+                sorted(result.superseded),
+            )
+        if wait_for_ack and (ack := result.value) is not None:
+            # Lost commands are logged and counted by the tracker
+            await asyncio.shield(ack)
+        return result.superseded
+
+    async def async_poll_status(self) -> bool:
+        """Request the device status and wait for the reply.
+
+        Returns True if a status frame arrived within the adaptive timeout.
+        """
+        status_event = self._status_event
+        # Empty attributes queue a status request in the background lane
+        await self.commands.async_send({}, CommandLane.BACKGROUND)
+        try:
+            await asyncio.wait_for(
+                status_event.wait(), timeout=self.latency.status.timeout
+            )
+        except asyncio.TimeoutError:
+            self.latency.status.record_timeout()
+            return False
+        if self.last_status_time >= self._status_requested:
+            # From the request leaving the queue, not from queueing it
+            self.latency.status.add_sample(
+                self.last_status_time - self._status_requested
+            )
+        return True
+
+    async def _async_send_now(
+        self, attrs: dict[str, Any]
+    ) -> asyncio.Future[float | None] | None:
+        """Send attributes to the device within its adaptive timeout.
+
+        Returns the future of the command's acknowledgement, None for
+        status requests.
+        """
+        dev_id = self.device_client.device_id
+        wrapper = DeviceClientWrapper(self.device_client)
+        # A failed or cancelled acquire releases the device itself
+        if self.session_pool is not None and not await self.session_pool.async_acquire(
+            dev_id
+        ):
+            raise ConnectionError("Device offline")
+        try:
+            if attrs:
+                # Pipeline commands up to the in-flight window of the session
+                await self.acks.async_wait_window()
+            if self.admission is None:
+                return await self._async_send_timed(attrs)
+            async with self.admission.async_admit(
+                dev_id,
+                wrapper.ip_address,
+                OPERATION_COMMAND if attrs else OPERATION_STATUS,
+            ):
+                return await self._async_send_timed(attrs)
+        finally:
+            if self.session_pool is not None:
+                self.session_pool.async_release(dev_id)
+
+    async def _async_send_timed(
+        self, attrs: dict[str, Any]
+    ) -> asyncio.Future[float | None] | None:
+        """Send attributes, or a status request if empty, with a timeout."""
+        ack = None
+        if attrs:
+            # Tracked before sending, the reply can arrive before send returns
+            ack = self.acks.track(attrs, self.latency.status.timeout)
+            send = self.device_client.send_dev_attr(attrs)
+        else:
+            self._status_requested = self.hass.loop.time()
+            self._status_reply_pending = True
+            send = DeviceClientWrapper(self.device_client).async_request_status()
+        try:
+            await asyncio.wait_for(send, timeout=self.latency.status.timeout)
+        except BaseException as err:
+            if ack is not None:
+                self.acks.discard(ack)
+            if isinstance(err, asyncio.TimeoutError):
+                self.latency.status.record_timeout()
+                raise ConnectionError("Timed out sending command") from err
+            raise
+        return ack
 
 
 class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
@@ -229,59 +441,110 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
             token=config_entry.data[CONF_LOGIN_INFO],
         )
         self.client.set_token_fresh_cb(self.token_fresh_cb)
+        self.cloud = CloudCircuitBreaker()
+        self.device_store = DeviceListStore(hass, config_entry.entry_id)
+        self._token_task: asyncio.Task | None = None
+        # Set while the user is asked for new credentials
+        self._reauth_pending = False
         self.device_coordinators: dict[str, AidotDeviceUpdateCoordinator] = {}
-        self.previous_lists: set[str] = set()
-        self._discovery_task: asyncio.Task | None = None
-        self._reconnect_task: asyncio.Task | None = None
+        self.reconciler = EntityReconciler(hass, config_entry)
+        self.circadian = CircadianScheduler(
+            hass, config_entry.entry_id, self.device_coordinators
+        )
+        self.discovery: AidotDiscoveryHub | None = None
+        self.storm_guard = ConnectionStormGuard(self._handle_recovery_complete)
+        self.admission = TopologyAdmission(
+            hass,
+            AdmissionGrouping(
+                config_entry.options.get(
+                    CONF_ADMISSION_GROUPING, DEFAULT_ADMISSION_GROUPING
+                )
+            ),
+        )
+        self._connection_tasks: dict[str, asyncio.Task] = {}
+        self._previous_states: dict[str, bool] = {}
+        self._device_list: list[dict[str, Any]] = []
+        self._warm_cache: AidotWarmCache | None = hass.data.get(
+            DATA_WARM_CACHE, {}
+        ).pop(config_entry.entry_id, None)
+        self.latency = LatencyTracker(hass, config_entry.entry_id)
+        self.options = dict(config_entry.options)
+        self.profiler = HotPathProfiler(self.options.get(CONF_PROFILING, False))
+        self._lag_task: asyncio.Task | None = None
+        self.session_pool: SessionPool | None = None
+        if self.options.get(CONF_LAZY_CONNECTIONS, False):
+            self.session_pool = SessionPool(
+                hass,
+                self.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+                self.options.get(CONF_MAX_SESSIONS, DEFAULT_MAX_SESSIONS),
+                self._async_open_session,
+                self._async_close_session,
+            )
+        self.poller: StatusPoller | None = None
+        if poll_interval := self.options.get(CONF_POLL_INTERVAL, 0):
+            self.poller = StatusPoller(
+                poll_interval,
+                self.options.get(CONF_POLL_CONCURRENCY, DEFAULT_POLL_CONCURRENCY),
+                self.device_coordinators.values,
+            )
+        self._poll_task: asyncio.Task | None = None
+        self.recorder: TrafficRecorder | None = None
+        if self.options.get(CONF_RECORD_TRAFFIC, False):
+            self.recorder = TrafficRecorder(hass, config_entry.entry_id)
+        self.setup_duration: float | None = None
+        self.unload_duration: float | None = None
+        self.connection_attempts = 0
+        self.connection_failures = 0
+        self.connection_retries = 0
+        self.ip_changes = 0
+        self._failed_devices: set[str] = set()
+        self.cloud_refresh = CallsiteStats()
 
     async def _async_setup(self) -> None:
         """Set up the coordinator."""
-        try:
-            await self.async_auto_login()
-        except AidotUserOrPassIncorrect as error:
-            raise ConfigEntryError from error
-
-        source_ip = await async_get_source_ip(self.hass)
-        _LOGGER.info(
-            "Starting device discovery on local network using source IP: %s",
-            source_ip or "default (0.0.0.0)",
+        # Failures are handled without raising: known devices are still
+        # controlled locally while the cloud is unavailable
+        await self.async_auto_login()
+        self._token_task = self.config_entry.async_create_background_task(
+            self.hass, self._async_refresh_token_loop(), f"{DOMAIN} token refresh"
         )
 
-        # Create discover with our callback
-        if self.client._discover is None:
-            self.client._discover = Discover(
-                self.client.login_info,
-                self._create_discover_callback(),
+        await self.latency.async_load()
+        await self.circadian.async_load()
+        self.circadian.async_start()
+        self.admission.async_start()
+        if self.recorder is not None:
+            self.recorder.async_start()
+        if self.session_pool is not None:
+            self.session_pool.async_start()
+        if self.poller is not None:
+            self._poll_task = self.config_entry.async_create_background_task(
+                self.hass, self.poller.async_run(), f"{DOMAIN} status poller"
+            )
+        if self.profiler.enabled:
+            self._lag_task = self.config_entry.async_create_background_task(
+                self.hass,
+                self.profiler.async_monitor_loop_lag(),
+                f"{DOMAIN} event loop lag monitor",
             )
 
-            if source_ip:
-                await _patch_discover_with_source_ip(self.client._discover, source_ip)
-
-            # Initialize the broadcast protocol BEFORE starting repeat_broadcast task
-            # This ensures our patched version creates the protocol first
-            _LOGGER.debug("Initializing discovery broadcast protocol")
-            await self.client._discover.try_create_broadcast()
-            
-            # Give connection_made() callback time to complete
-            await asyncio.sleep(0.1)
-            
-            # Verify protocol has transport before proceeding
-            if (
-                self.client._discover._broadcast_protocol is not None
-                and hasattr(self.client._discover._broadcast_protocol, "transport")
-            ):
-                _LOGGER.info("Discovery protocol initialized successfully")
-            else:
-                _LOGGER.warning("Discovery protocol may not be fully initialized")
+        # Share one discovery endpoint and reconnect supervisor with all
+        # other AiDot entries
+        self.discovery = async_get_discovery_hub(self.hass)
+        await self.discovery.async_register(
+            self.config_entry.entry_id,
+            self.client.login_info,
+            self._handle_discovery,
+            self._check_connections,
+            self.profiler.enabled,
+        )
 
-            # Start the ongoing broadcast task (now that protocol exists)
-            self._discovery_task = asyncio.create_task(
-                self.client._discover.repeat_broadcast()
-            )
-            self._discovery_task.add_done_callback(self._handle_discovery_task_done)
-            _LOGGER.info("Device discovery broadcast task started")
-        else:
-            _LOGGER.warning("Discovery already started, skipping initialization")
+        if self._warm_cache is not None and self._warm_cache.fresh:
+            # Reload: device IPs are already known, skip the startup burst
+            _LOGGER.debug("Reusing warm device cache, skipping startup discovery")
+            self.discovery.async_broadcast()
+            return
+        self._warm_cache = None
 
         # Aggressive startup discovery - burst of broadcasts
         _LOGGER.info(
@@ -289,67 +552,127 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
             DISCOVERY_STARTUP_BURST_COUNT,
         )
         for i in range(DISCOVERY_STARTUP_BURST_COUNT):
-            if self.client._discover:
-                # Don't call try_create_broadcast again - protocol already exists
-                await self.client._discover.send_broadcast()
-                _LOGGER.debug(
-                    "Startup discovery broadcast %d/%d sent",
-                    i + 1,
-                    DISCOVERY_STARTUP_BURST_COUNT,
-                )
+            self.discovery.async_broadcast()
+            _LOGGER.debug(
+                "Startup discovery broadcast %d/%d sent",
+                i + 1,
+                DISCOVERY_STARTUP_BURST_COUNT,
+            )
             if i < DISCOVERY_STARTUP_BURST_COUNT - 1:
                 await asyncio.sleep(DISCOVERY_STARTUP_BURST_INTERVAL)
 
         # Brief wait after burst for responses
         await asyncio.sleep(DISCOVERY_INITIAL_DELAY)
 
-        if self.client._discover:
-            wrapper = DiscoverWrapper(self.client._discover)
-            _LOGGER.info(
-                "After startup discovery: found %d device(s): %s",
-                len(wrapper.discovered_devices),
-                list(wrapper.discovered_devices.keys()),
-            )
-        else:
-            _LOGGER.error("Discovery object is None after setup")
-
-        # Start reconnect loop
-        self._reconnect_task = asyncio.create_task(self._reconnect_loop())
-        self._reconnect_task.add_done_callback(self._handle_reconnect_task_done)
-
-    def _create_discover_callback(self):
-        """Create the discovery callback with access to self."""
+        _LOGGER.info(
+            "After startup discovery: found %d device(s) on the network",
+            len(self.discovery.discovered_devices),
+        )
 
-        def _discover_callback(dev_id: str, event: dict[str, str]) -> None:
-            device_ip = event["ipAddress"]
+    @callback
+    @profiled("discovery_callback")
+    def _handle_discovery(self, devices: dict[str, str]) -> None:
+        """Handle a batch of discovery replies for this entry's devices."""
+        for dev_id, device_ip in devices.items():
             _LOGGER.debug("Discovery: device %s at IP %s", dev_id, device_ip)
+            if self.recorder is not None:
+                self.recorder.record(EVENT_DISCOVERY, dev_id, device_ip)
 
-            # Update IP on existing device client
+            # The IP is set directly rather than through update_ip_address(),
+            # which would start a login that bypasses the storm guard
             device_client = self.client._device_clients.get(dev_id)
             if device_client is not None:
-                device_client.update_ip_address(device_ip)
-
-            # If we have a coordinator for this device, attempt connection
-            if dev_id in self.device_coordinators:
-                coordinator = self.device_coordinators[dev_id]
-                if not coordinator.is_connected:
-                    # Schedule async connection attempt
-                    self.hass.async_create_task(
-                        self._attempt_device_connection(dev_id)
-                    )
+                wrapper = DeviceClientWrapper(device_client)
+                if wrapper.ip_address != device_ip:
+                    wrapper.set_ip_address(device_ip)
+                    self.ip_changes += 1
+
+            # Connect devices that are not connected. In lazy mode sessions
+            # are only opened when needed.
+            if (coordinator := self.device_coordinators.get(dev_id)) is not None:
+                if (
+                    not self._check_connection_state(dev_id, coordinator)
+                    and self.session_pool is None
+                ):
+                    self._schedule_device_connection(dev_id)
+
+    def _schedule_device_connection(self, dev_id: str) -> None:
+        """Schedule a connection attempt unless one is already pending."""
+        if dev_id in self._connection_tasks:
+            return
+        self._connection_tasks[dev_id] = self.hass.async_create_task(
+            self._attempt_device_connection(dev_id), eager_start=False
+        )
 
-        return _discover_callback
+    async def _async_open_session(self, dev_id: str) -> bool:
+        """Open a device session on demand in lazy mode."""
+        if dev_id not in self.device_coordinators:
+            return False
+        self._schedule_device_connection(dev_id)
+        if (task := self._connection_tasks.get(dev_id)) is not None:
+            await asyncio.shield(task)
+        return self.device_coordinators[dev_id].is_connected
+
+    async def _async_close_session(self, dev_id: str) -> None:
+        """Close an idle device session in lazy mode."""
+        if (coordinator := self.device_coordinators.get(dev_id)) is None:
+            return
+        # Not a disconnect: keep it out of storm detection
+        self._previous_states[dev_id] = False
+        await coordinator.device_client.reset()
+        coordinator.async_set_updated_data(coordinator.device_client.status)
 
     async def _attempt_device_connection(self, dev_id: str) -> None:
         """Attempt to connect to a device and sync its status."""
+        try:
+            await self.storm_guard.async_acquire()
+            start_time = time.monotonic()
+            self.connection_attempts += 1
+            if dev_id in self._failed_devices:
+                self.connection_retries += 1
+            success = False
+            try:
+                success = await self._async_connect_device(dev_id)
+            finally:
+                if success:
+                    self._failed_devices.discard(dev_id)
+                else:
+                    self.connection_failures += 1
+                    self._failed_devices.add(dev_id)
+                if self.recorder is not None:
+                    self.recorder.record(
+                        EVENT_CONNECT,
+                        dev_id,
+                        [success, round(time.monotonic() - start_time, 3)],
+                    )
+                await self.storm_guard.async_release(dev_id, success)
+                self.latency.async_schedule_save()
+        finally:
+            self._connection_tasks.pop(dev_id, None)
+
+    @profiled("device_connect")
+    async def _async_connect_device(self, dev_id: str) -> bool:
+        """Connect to a device and sync its status once admitted."""
         if dev_id not in self.device_coordinators:
-            return
+            return False
 
         coordinator = self.device_coordinators[dev_id]
+        if coordinator.is_connected:
+            # Connected by another path while waiting for admission
+            return True
 
         _LOGGER.debug("Attempting connection to device %s", dev_id)
 
-        if await coordinator.async_connect_and_wait_for_status():
+        async with self.admission.async_admit(
+            dev_id,
+            DeviceClientWrapper(coordinator.device_client).ip_address,
+            OPERATION_LOGIN,
+        ) as admission:
+            connected = await coordinator.async_connect_and_wait_for_status()
+            admission.failed = not connected
+
+        if connected:
+            self._previous_states[dev_id] = True
             _LOGGER.info(
                 "Device %s connected - state: on=%s, brightness=%s, available=%s",
                 dev_id,
@@ -359,92 +682,159 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
             )
             # Trigger entity update
             coordinator.async_set_updated_data(coordinator.device_client.status)
-        else:
-            _LOGGER.debug("Device %s connection attempt failed", dev_id)
-
-    async def _reconnect_loop(self) -> None:
-        """Periodically attempt to reconnect disconnected devices."""
-        # Track previously known connection states
-        previous_states = {}
+            return True
 
-        while True:
-            await asyncio.sleep(RECONNECT_INTERVAL)
+        _LOGGER.debug("Device %s connection attempt failed", dev_id)
+        return False
 
-            # Check all devices for connection state changes
-            for dev_id, coord in self.device_coordinators.items():
-                is_connected = coord.is_connected
-                was_connected = previous_states.get(dev_id, None)
+    def _check_connection_state(
+        self, dev_id: str, coord: AidotDeviceUpdateCoordinator
+    ) -> bool:
+        """Track a device's connection state and report disconnects.
 
-                # Detect transition from connected to disconnected
-                if was_connected is True and is_connected is False:
-                    _LOGGER.warning(
-                        "Device %s has disconnected (was online, now offline)",
-                        dev_id,
-                    )
-                    # Trigger coordinator update to mark entity as unavailable
-                    coord.async_set_updated_data(coord.device_client.status)
+        Returns the current connection state.
+        """
+        is_connected = coord.is_connected
+        was_connected = self._previous_states.get(dev_id)
 
-                # Update tracked state
-                previous_states[dev_id] = is_connected
+        # Detect transition from connected to disconnected
+        if was_connected is True and is_connected is False:
+            _LOGGER.warning(
+                "Device %s has disconnected (was online, now offline)",
+                dev_id,
+            )
+            self.storm_guard.record_disconnect(dev_id)
+            if self.recorder is not None:
+                self.recorder.record(EVENT_DISCONNECT, dev_id)
+            if self.session_pool is not None:
+                self.session_pool.async_forget(dev_id)
+            # Trigger coordinator update to mark entity as unavailable
+            coord.async_set_updated_data(coord.device_client.status)
+
+        # Update tracked state
+        self._previous_states[dev_id] = is_connected
+        return is_connected
+
+    @callback
+    def _handle_recovery_complete(self, report: RecoveryReport) -> None:
+        """Announce the end of a connection storm recovery."""
+        self.hass.bus.async_fire(
+            EVENT_RECOVERY_COMPLETE,
+            {
+                "entry_id": self.config_entry.entry_id,
+                "duration": round(report.duration, 3),
+                "recovered": report.recovered,
+                "unrecovered": report.unrecovered,
+                "attempts": report.attempts,
+                "failures": report.failures,
+            },
+        )
 
-            # Find disconnected devices
-            disconnected = [
-                dev_id
-                for dev_id, coord in self.device_coordinators.items()
-                if not coord.is_connected
-            ]
+    @callback
+    @profiled("reconnect_check")
+    def _check_connections(self) -> bool:
+        """Check all devices for disconnects, called by the discovery hub.
 
-            if not disconnected:
-                continue
+        Returns True if a discovery broadcast is needed to find devices.
+        """
+        disconnected = [
+            dev_id
+            for dev_id, coord in self.device_coordinators.items()
+            if not self._check_connection_state(dev_id, coord)
+        ]
+        self.storm_guard.update_connected(
+            len(self.device_coordinators) - len(disconnected)
+        )
+        self.storm_guard.check_timeout()
 
-            _LOGGER.debug(
-                "Reconnect loop: %d disconnected device(s): %s",
-                len(disconnected),
-                disconnected,
+        if self.session_pool is not None:
+            # Lazy mode only needs discovery for devices without an IP
+            return any(
+                DeviceClientWrapper(coord.device_client).ip_address is None
+                for coord in self.device_coordinators.values()
             )
 
-            # Send discovery broadcast to find device IPs
-            if self.client._discover:
-                await self.client._discover.try_create_broadcast()
-                await self.client._discover.send_broadcast()
-
-    def _handle_reconnect_task_done(self, task: asyncio.Task) -> None:
-        """Handle reconnect task completion or failure."""
-        try:
-            task.result()
-        except asyncio.CancelledError:
-            _LOGGER.debug("Reconnect task was cancelled")
-        except Exception:
-            _LOGGER.exception("Reconnect task failed with unexpected error")
+        if not disconnected:
+            return False
 
+        _LOGGER.debug(
+            "Reconnect check: %d disconnected device(s): %s",
+            len(disconnected),
+            disconnected,
+        )
+        # Repeated discovery replies are deduplicated by the hub, so
+        # reconnect devices with a known IP directly
+        for dev_id in disconnected:
+            device_client = self.device_coordinators[dev_id].device_client
+            if DeviceClientWrapper(device_client).ip_address:
+                self._schedule_device_connection(dev_id)
+        return True
+
+    @profiled("device_list_update")
     async def _async_update_data(self) -> None:
         """Update data async - fetch device list and create coordinators."""
-        try:
-            data = await self.client.async_get_all_device()
-        except AidotAuthFailed as error:
-            self.token_fresh_cb()
-            raise ConfigEntryError from error
+        from_cloud = False
+        if (warm_cache := self._warm_cache) is not None:
+            # First refresh after a reload: reuse the device list of the
+            # previous entry instead of asking the cloud again
+            self._warm_cache = None
+            devices = warm_cache.devices
+        elif (devices := await self._async_fetch_device_list()) is not None:
+            from_cloud = True
+        elif self._device_list:
+            # Cloud unavailable: keep controlling the known devices
+            return
+        elif (devices := await self.device_store.async_load()) is not None:
+            _LOGGER.info(
+                "AiDot cloud unavailable, starting with %d stored device(s)",
+                len(devices),
+            )
+        else:
+            raise UpdateFailed("AiDot cloud unavailable and no stored device list")
 
         filter_device_list = [
             device
-            for device in data.get(CONF_DEVICE_LIST, [])
+            for device in devices
             if (
                 device[CONF_TYPE] == Platform.LIGHT
                 and CONF_AES_KEY in device
                 and device[CONF_AES_KEY][0] is not None
             )
         ]
+        if from_cloud:
+            self.device_store.async_save(filter_device_list)
+        if self.recorder is not None:
+            self.recorder.record(
+                EVENT_DEVICES, None, redact_devices(filter_device_list)
+            )
 
         current_device_ids = {device[CONF_ID] for device in filter_device_list}
+        self._device_list = filter_device_list
 
         # Handle removed devices
         removed_ids = set(self.device_coordinators.keys()) - current_device_ids
         for dev_id in removed_ids:
             _LOGGER.info("Device %s removed from account", dev_id)
-            del self.device_coordinators[dev_id]
-
-        if removed_ids:
-            self._purge_deleted_lists()
+            removed = self.device_coordinators.pop(dev_id)
+            removed.commands.cancel()
+            removed.acks.cancel()
+            wrapper = DeviceClientWrapper(removed.device_client)
+            if wrapper.has_session:
+                await self.client.remove_device_client(dev_id)
+            else:
+                wrapper.stop()
+                self.client._device_clients.pop(dev_id, None)
+            self._previous_states.pop(dev_id, None)
+            self.storm_guard.forget(dev_id)
+            self._failed_devices.discard(dev_id)
+            self.latency.remove(dev_id)
+            if self.session_pool is not None:
+                self.session_pool.async_forget(dev_id)
+
+        if self.discovery is not None:
+            self.discovery.async_set_devices(
+                self.config_entry.entry_id, current_device_ids
+            )
 
         # Create coordinators for new devices (they start as unavailable)
         for device in filter_device_list:
@@ -455,12 +845,35 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
 
             _LOGGER.debug("Creating coordinator for device %s", dev_id)
 
-            # Create device client
+            # Create device client, seeded with the IP if it was already
+            # discovered (possibly by another entry)
             device_client = self.client.get_device_client(device)
+            wrapper = DeviceClientWrapper(device_client)
+            if (
+                self.discovery is not None
+                and not wrapper.ip_address
+                and (ip := self.discovery.discovered_devices.get(dev_id))
+            ):
+                wrapper.set_ip_address(ip)
+            if warm_cache is not None:
+                if not wrapper.ip_address and (
+                    ip := warm_cache.ip_addresses.get(dev_id)
+                ):
+                    wrapper.set_ip_address(ip)
+                if (status := warm_cache.statuses.get(dev_id)) is not None:
+                    device_client.status = status
+                    status.online = False
 
             # Create coordinator (starts as unavailable until connected)
             device_coordinator = AidotDeviceUpdateCoordinator(
-                self.hass, self.config_entry, device_client
+                self.hass,
+                self.config_entry,
+                device_client,
+                self.latency.get(dev_id),
+                self.profiler,
+                self.session_pool,
+                self.recorder,
+                self.admission,
             )
             await device_coordinator._async_setup()
 
@@ -476,37 +889,179 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
             )
 
             # Attempt immediate connection if IP is known
-            wrapper = DeviceClientWrapper(device_client)
-            if wrapper.ip_address:
-                self.hass.async_create_task(self._attempt_device_connection(dev_id))
-
-    def cleanup(self) -> None:
-        """Perform cleanup actions."""
-        if self._discovery_task and not self._discovery_task.done():
-            self._discovery_task.cancel()
-
-        if self._reconnect_task and not self._reconnect_task.done():
-            self._reconnect_task.cancel()
-
-        # Close the discovery transport if it was created
-        if self.client._discover:
-            wrapper = DiscoverWrapper(self.client._discover)
-            if wrapper.has_transport:
-                transport = wrapper.get_transport()
-                if transport and not transport.is_closing():
-                    transport.close()
-                    _LOGGER.debug("Closed discovery UDP transport")
-
-        self.client.cleanup()
-
-    def _handle_discovery_task_done(self, task: asyncio.Task) -> None:
-        """Handle discovery task completion or failure."""
+            if wrapper.ip_address and self.session_pool is None:
+                self._schedule_device_connection(dev_id)
+
+    async def _async_fetch_device_list(self) -> list[dict[str, Any]] | None:
+        """Fetch the device list from the cloud.
+
+        Returns None if the cloud cannot be reached, the circuit breaker is
+        open or the account needs to be re-authenticated.
+        """
+        if self.client.login_info.get(CONF_ACCESS_TOKEN) is None:
+            if not await self.async_auto_login():
+                return None
+        if not self.cloud.allow_request():
+            return None
+        start_time = time.perf_counter()
         try:
-            task.result()
-        except asyncio.CancelledError:
-            _LOGGER.debug("Discovery task was cancelled")
-        except Exception:
-            _LOGGER.exception("Discovery task failed with unexpected error")
+            data = await self.client.async_get_all_device()
+        except AidotAuthFailed:
+            # The token could not be refreshed; log in again next time
+            self.cloud.record_success()
+            self.client.login_info[CONF_ACCESS_TOKEN] = None
+            self.token_fresh_cb()
+            return None
+        except Exception as err:  # noqa: BLE001
+            # python-aidot surfaces network and server errors as assorted
+            # exception types
+            self.cloud.record_failure()
+            _LOGGER.warning("Cannot fetch AiDot device list: %s", err)
+            return None
+        self.cloud.record_success()
+        self.cloud_refresh.record(time.perf_counter() - start_time)
+        return data.get(CONF_DEVICE_LIST, [])
+
+    async def _async_refresh_token_loop(self) -> None:
+        """Refresh the access token before it expires until cancelled."""
+        while True:
+            if (expiry := token_expiry(self.client.login_info)) is not None:
+                delay = expiry - TOKEN_REFRESH_MARGIN - time.time()
+            else:
+                delay = TOKEN_REFRESH_INTERVAL
+            await asyncio.sleep(max(CLOUD_RETRY_MIN, delay))
+            while not await self._async_refresh_token():
+                await asyncio.sleep(max(CLOUD_RETRY_MIN, self.cloud.retry_in))
+
+    async def _async_refresh_token(self) -> bool:
+        """Refresh the access token, logging in again if needed.
+
+        Returns False if the refresh should be retried later.
+        """
+        if self.client.login_info.get(CONF_ACCESS_TOKEN) is None:
+            return await self.async_auto_login()
+        if not self.cloud.allow_request():
+            return False
+        try:
+            # Calls token_fresh_cb() on success
+            result = await self.client.async_refresh_token()
+        except AidotAuthFailed:
+            self.cloud.record_success()
+            self.client.login_info[CONF_ACCESS_TOKEN] = None
+            return await self.async_auto_login()
+        except Exception as err:  # noqa: BLE001
+            self.cloud.record_failure()
+            _LOGGER.debug("AiDot token refresh failed: %s", err)
+            return False
+        if result is None:
+            self.cloud.record_failure()
+            return False
+        self.cloud.record_success()
+        return True
+
+    @callback
+    def async_update_login_info(self, login_info: dict[str, Any]) -> None:
+        """Adopt login info stored in the entry, e.g. after reauthentication."""
+        if login_info == self.client.login_info:
+            # Written by token_fresh_cb()
+            return
+        _LOGGER.debug("Adopting new AiDot login info")
+        self.client.login_info = login_info.copy()
+        self._reauth_pending = False
+        self.cloud.reset()
+        self.config_entry.async_create_background_task(
+            self.hass, self.async_request_refresh(), f"{DOMAIN} device list refresh"
+        )
+
+    async def async_unload(self) -> None:
+        """Shut down discovery, connection tasks and device sessions.
+
+        Device sessions are closed concurrently under UNLOAD_TIMEOUT; any
+        session still open at the deadline is aborted. The device list, IPs
+        and last known status are kept for a reload of the same entry.
+        """
+        start = time.monotonic()
+        entry_id = self.config_entry.entry_id
+        async_release_discovery_hub(self.hass, entry_id)
+        self.discovery = None
+        self.circadian.async_stop()
+        self.admission.async_stop()
+        if self.session_pool is not None:
+            self.session_pool.async_stop()
+
+        tasks = list(self._connection_tasks.values())
+        for task in (self._poll_task, self._lag_task, self._token_task):
+            if task is not None:
+                tasks.append(task)
+        self._poll_task = self._lag_task = self._token_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for device_coordinator in self.device_coordinators.values():
+            device_coordinator.commands.cancel()
+            device_coordinator.acks.cancel()
+
+        device_clients = list(self.client._device_clients.values())
+        if self._device_list:
+            warm_caches = self.hass.data.setdefault(DATA_WARM_CACHE, {})
+            # Drop caches of entries that were not set up again, e.g. disabled
+            for stale_id in [
+                cache_id
+                for cache_id, cache in warm_caches.items()
+                if not cache.fresh
+            ]:
+                del warm_caches[stale_id]
+            warm_caches[entry_id] = AidotWarmCache(
+                created=time.monotonic(),
+                devices=self._device_list,
+                ip_addresses={
+                    device_client.device_id: ip
+                    for device_client in device_clients
+                    if (ip := DeviceClientWrapper(device_client).ip_address)
+                },
+                statuses={
+                    device_client.device_id: copy.copy(device_client.status)
+                    for device_client in device_clients
+                },
+            )
+
+        # Clients that never opened a session only need their ping task
+        # stopped, closing them makes python-aidot log an error
+        sessions = []
+        for device_client in device_clients:
+            wrapper = DeviceClientWrapper(device_client)
+            if wrapper.has_session:
+                sessions.append(device_client)
+            else:
+                wrapper.stop()
+        if sessions:
+            _, pending = await asyncio.wait(
+                [
+                    asyncio.create_task(device_client.close())
+                    for device_client in sessions
+                ],
+                timeout=UNLOAD_TIMEOUT,
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                _LOGGER.debug(
+                    "Aborting %d device session(s) that did not close in time",
+                    len(pending),
+                )
+                for device_client in sessions:
+                    DeviceClientWrapper(device_client).abort()
+        self.client._device_clients.clear()
+
+        # Written now so no delayed save can recreate it after entry removal
+        await self.latency.async_save()
+        if self.recorder is not None:
+            await self.recorder.async_stop()
+        self.unload_duration = time.monotonic() - start
+        _LOGGER.info(
+            "Unloaded %d device(s) in %.2fs", len(device_clients), self.unload_duration
+        )
 
     def token_fresh_cb(self) -> None:
         """Update token."""
@@ -514,30 +1069,31 @@ class AidotDeviceManagerCoordinator(DataUpdateCoordinator[None]):
             self.config_entry, data={CONF_LOGIN_INFO: self.client.login_info.copy()}
         )
 
-    async def async_auto_login(self) -> None:
-        """Async auto login."""
-        if self.client.login_info.get(CONF_ACCESS_TOKEN) is None:
-            try:
-                await self.client.async_post_login()
-            except AidotUserOrPassIncorrect as error:
-                raise AidotUserOrPassIncorrect from error
-
-    def _purge_deleted_lists(self) -> None:
-        """Purge device entries of deleted lists."""
-
-        device_reg = dr.async_get(self.hass)
-        identifiers = {
-            (
-                DOMAIN,
-                f"{device_coordinator.device_client.info.dev_id}",
+    async def async_auto_login(self) -> bool:
+        """Log in with the stored credentials if there is no access token.
+
+        Starts a reauthentication flow if the credentials are rejected.
+        Returns True if an access token is available.
+        """
+        if self.client.login_info.get(CONF_ACCESS_TOKEN) is not None:
+            return True
+        if self._reauth_pending or not self.cloud.allow_request():
+            return False
+        try:
+            await self.client.async_post_login()
+        except AidotUserOrPassIncorrect:
+            self.cloud.record_success()
+            _LOGGER.warning(
+                "AiDot rejected the stored credentials; lights are still "
+                "controlled locally until the account is re-authenticated"
             )
-            for device_coordinator in self.device_coordinators.values()
-        }
-        for device in dr.async_entries_for_config_entry(
-            device_reg, self.config_entry.entry_id
-        ):
-            if not set(device.identifiers) & identifiers:
-                _LOGGER.debug("Removing obsolete device entry %s", device.name)
-                device_reg.async_update_device(
-                    device.id, remove_config_entry_id=self.config_entry.entry_id
-                )
+            self._reauth_pending = True
+            self.config_entry.async_start_reauth(self.hass)
+            return False
+        except Exception as err:  # noqa: BLE001
+            self.cloud.record_failure()
+            _LOGGER.warning("Cannot log in to AiDot: %s", err)
+            return False
+        self.cloud.record_success()
+        self.token_fresh_cb()
+        return True
@@ -0,0 +1,282 @@
+"""AES measurement and offloading for Aidot traffic.
+
+python-aidot encrypts and decrypts every device and discovery frame on the
+event loop, building a new cipher for each frame. While performance
+statistics are enabled, the functions of a CryptoMonitor are installed in
+its place (see device_wrapper.py): they reuse a cipher per key from a small
+LRU cache and time every call, and the share of event loop time spent in
+AES is reported per CRYPTO_WINDOW.
+
+Discovery replies arrive as raw datagrams, and every broadcast is answered
+by every device. The ReplyOffloader decrypts them on the event loop while
+that is cheap; once they take more than CRYPTO_OFFLOAD_THRESHOLD of loop
+time, replies are queued and decrypted in batches on a small thread pool,
+and the time spent there is reported as event loop time saved.
+
+Session frames and the login handshake cannot be offloaded the same way:
+python-aidot decrypts them synchronously inside its own receive loop and
+login coroutine, which use the plaintext right away. Moving them off the
+loop would mean replacing those coroutines rather than wrapping them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+from typing import Any
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from homeassistant.core import HomeAssistant, callback
+
+from aidot.const import CONF_IPADDRESS
+
+from .const import (
+    CRYPTO_CIPHER_CACHE_SIZE,
+    CRYPTO_MAX_BATCH,
+    CRYPTO_MAX_PENDING,
+    CRYPTO_OFFLOAD_THRESHOLD,
+    CRYPTO_OFFLOAD_WORKERS,
+    CRYPTO_WINDOW,
+    DOMAIN,
+)
+from .device_wrapper import parse_discovery_reply
+from .profiling import CallsiteStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Called with the device ID and {"ipAddress": ...} like BroadcastProtocol's
+type ReplyCallback = Callable[[str, dict[str, str]], None]
+
+
+class CryptoMonitor:
+    """Time the AES work python-aidot does on the event loop."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.encrypt = CallsiteStats()
+        self.decrypt = CallsiteStats()
+        # Share of event loop time spent in AES over the last full window
+        self.load = 0.0
+        self._window_start = time.monotonic()
+        self._window_time = 0.0
+        # Devices use 16 byte keys, discovery a 32 byte key
+        self._ciphers: OrderedDict[bytes, Cipher] = OrderedDict()
+
+    def _cipher(self, key: bytes | bytearray) -> Cipher:
+        """Return the cached cipher for a key."""
+        key = bytes(key)
+        if (cipher := self._ciphers.get(key)) is not None:
+            self._ciphers.move_to_end(key)
+            return cipher
+        cipher = self._ciphers[key] = Cipher(algorithms.AES(key), modes.ECB())
+        if len(self._ciphers) > CRYPTO_CIPHER_CACHE_SIZE:
+            self._ciphers.popitem(last=False)
+        return cipher
+
+    def timed_encrypt(self, plaintext: bytes, key: bytes | bytearray) -> bytes:
+        """Encrypt and pad a frame like python-aidot does, and time it."""
+        start = time.perf_counter()
+        try:
+            padder = padding.PKCS7(algorithms.AES.block_size).padder()
+            encryptor = self._cipher(key).encryptor()
+            return (
+                encryptor.update(padder.update(plaintext) + padder.finalize())
+                + encryptor.finalize()
+            )
+        finally:
+            self._account(self.encrypt, time.perf_counter() - start)
+
+    def timed_decrypt(self, ciphertext: bytes, key: bytes | bytearray) -> str:
+        """Decrypt and unpad a frame like python-aidot does, and time it."""
+        start = time.perf_counter()
+        try:
+            decryptor = self._cipher(key).decryptor()
+            unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+            padded = decryptor.update(ciphertext) + decryptor.finalize()
+            return (unpadder.update(padded) + unpadder.finalize()).decode()
+        finally:
+            self._account(self.decrypt, time.perf_counter() - start)
+
+    def _account(self, stats: CallsiteStats, duration: float) -> None:
+        """Record a duration and update the load once per window."""
+        stats.record(duration)
+        self._window_time += duration
+        now = time.monotonic()
+        if (elapsed := now - self._window_start) < CRYPTO_WINDOW:
+            return
+        self.load = self._window_time / elapsed
+        self._window_start = now
+        self._window_time = 0.0
+
+    def clear(self) -> None:
+        """Forget the cached ciphers and with them the keys."""
+        self._ciphers.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for service responses."""
+        return {
+            "encrypt": self.encrypt.as_dict(),
+            "decrypt": self.decrypt.as_dict(),
+            "loop_load_percent": round(self.load * 100, 2),
+        }
+
+
+def _parse_replies(
+    datagrams: list[tuple[bytes, str]], key: bytes
+) -> tuple[list[tuple[str, str]], float]:
+    """Decrypt discovery replies in a worker thread.
+
+    Returns (dev_id, ip_address) of each device reply and the time spent.
+    """
+    start = time.perf_counter()
+    replies = [
+        (dev_id, ip_address)
+        for data, ip_address in datagrams
+        if (dev_id := parse_discovery_reply(data, key)) is not None
+    ]
+    return replies, time.perf_counter() - start
+
+
+class ReplyOffloader:
+    """Decrypt discovery replies on the event loop or, under load, a thread pool."""
+
+    def __init__(self, hass: HomeAssistant, on_reply: ReplyCallback) -> None:
+        """Initialize the offloader.
+
+        Args:
+            hass: Home Assistant instance
+            on_reply: Called on the event loop for every device reply
+        """
+        self.hass = hass
+        self._on_reply = on_reply
+        self.offloading = False
+        self.offloaded = 0
+        self.dropped = 0
+        # Decryption time spent in the thread pool instead of the loop
+        self.loop_time_saved = 0.0
+        # Share of loop time replies took, or would have taken, last window
+        self.load = 0.0
+        self._window_start = time.monotonic()
+        self._window_time = 0.0
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: list[tuple[bytes, str]] = []
+        self._pending_key = b""
+        self._drain_task: asyncio.Task | None = None
+
+    @callback
+    def handle(self, data: bytes, ip_address: str, key: bytes) -> None:
+        """Handle a discovery reply datagram.
+
+        Args:
+            data: The encrypted reply
+            ip_address: Address the reply came from
+            key: Key from device_wrapper.discovery_key()
+        """
+        if self.offloading:
+            self._submit(data, ip_address, key)
+            return
+        start = time.perf_counter()
+        dev_id = parse_discovery_reply(data, key)
+        self._account(time.perf_counter() - start)
+        if dev_id is not None:
+            self._on_reply(dev_id, {CONF_IPADDRESS: ip_address})
+
+    def _account(self, duration: float) -> None:
+        """Add reply decryption time and re-evaluate the load once per window."""
+        self._window_time += duration
+        now = time.monotonic()
+        if (elapsed := now - self._window_start) < CRYPTO_WINDOW:
+            return
+        self.load = self._window_time / elapsed
+        self._window_start = now
+        self._window_time = 0.0
+        if not self.offloading and self.load > CRYPTO_OFFLOAD_THRESHOLD:
+            _LOGGER.debug(
+                "Discovery replies took %.1f%% of the event loop, offloading",
+                self.load * 100,
+            )
+            self.offloading = True
+        elif self.offloading and self.load < CRYPTO_OFFLOAD_THRESHOLD / 2:
+            _LOGGER.debug(
+                "Discovery replies take %.1f%% of the event loop, decrypting inline",
+                self.load * 100,
+            )
+            self.offloading = False
+
+    def _submit(self, data: bytes, ip_address: str, key: bytes) -> None:
+        """Queue a reply and start draining the queue if needed."""
+        if len(self._pending) >= CRYPTO_MAX_PENDING:
+            # Replies repeat with every broadcast, the next one will do
+            self.dropped += 1
+            return
+        self._pending.append((data, ip_address))
+        self._pending_key = key
+        if self._drain_task is None:
+            self._drain_task = self.hass.async_create_background_task(
+                self._async_drain(), f"{DOMAIN} discovery reply decryption"
+            )
+
+    async def _async_drain(self) -> None:
+        """Decrypt queued replies in batches and hand them over."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                CRYPTO_OFFLOAD_WORKERS, thread_name_prefix="aidot_crypto"
+            )
+        loop = self.hass.loop
+        try:
+            while self._pending:
+                # One batch per worker in flight at a time
+                count = min(
+                    len(self._pending), CRYPTO_MAX_BATCH * CRYPTO_OFFLOAD_WORKERS
+                )
+                queued = self._pending[:count]
+                del self._pending[:count]
+                batches = [
+                    queued[i : i + CRYPTO_MAX_BATCH]
+                    for i in range(0, count, CRYPTO_MAX_BATCH)
+                ]
+                results = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            self._executor, _parse_replies, batch, self._pending_key
+                        )
+                        for batch in batches
+                    )
+                )
+                for batch, (replies, duration) in zip(batches, results, strict=True):
+                    self.offloaded += len(batch)
+                    self.loop_time_saved += duration
+                    # The load keeps counting offloaded work, so offloading
+                    # stops once replies would be cheap on the loop again
+                    self._account(duration)
+                    for dev_id, ip_address in replies:
+                        self._on_reply(dev_id, {CONF_IPADDRESS: ip_address})
+        finally:
+            self._drain_task = None
+
+    @callback
+    def shutdown(self) -> None:
+        """Drop queued replies, stop draining and stop the thread pool."""
+        self._pending.clear()
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for service responses."""
+        return {
+            "offloading": self.offloading,
+            "load_percent": round(self.load * 100, 2),
+            "offloaded_replies": self.offloaded,
+            "dropped_replies": self.dropped,
+            "loop_time_saved_ms": round(self.loop_time_saved * 1000, 3),
+        }
@@ -9,10 +9,110 @@ When upgrading python-aidot, check this file first for compatibility.
 Current version: python-aidot==0.3.45
 """
 
-from typing import Any
+from __future__ import annotations
 
-from aidot.device_client import DeviceClient
-from aidot.discover import Discover
+from collections.abc import Callable
+import json
+from typing import TYPE_CHECKING, Any
+
+from aidot import (
+    aes_utils,
+    device_client as device_client_module,
+    discover as discover_module,
+)
+from aidot.device_client import DeviceClient, DeviceStatusData
+from aidot.discover import BroadcastProtocol
+
+if TYPE_CHECKING:
+    from .crypto import CryptoMonitor
+
+# AES functions python-aidot imported into its modules, as shipped
+_LIBRARY_CRYPTO = {
+    module: (module.aes_encrypt, module.aes_decrypt)
+    for module in (device_client_module, discover_module)
+}
+
+
+def install_crypto(monitor: CryptoMonitor) -> None:
+    """Route python-aidot's AES calls through a crypto monitor.
+
+    The replacement is process-wide, so it is only installed while an entry
+    has performance statistics enabled and undone by uninstall_crypto()
+    when the last such entry unloads.
+
+    Args:
+        monitor: Monitor whose timed functions replace the library's
+
+    Note:
+        Replaces module globals: aidot.device_client.aes_encrypt/aes_decrypt
+        and aidot.discover.aes_encrypt/aes_decrypt
+    """
+    for module in _LIBRARY_CRYPTO:
+        module.aes_encrypt = monitor.timed_encrypt
+        module.aes_decrypt = monitor.timed_decrypt
+
+
+def uninstall_crypto() -> None:
+    """Restore python-aidot's own AES functions."""
+    for module, (encrypt, decrypt) in _LIBRARY_CRYPTO.items():
+        module.aes_encrypt = encrypt
+        module.aes_decrypt = decrypt
+
+
+def send_broadcast(protocol: BroadcastProtocol, user_id: str) -> None:
+    """Send a discovery broadcast on behalf of an account.
+
+    The protocol puts the user ID it was created with in the srcAddr of
+    every broadcast; a shared endpoint must not keep using the ID of an
+    entry that has been unloaded.
+
+    Args:
+        protocol: The discovery endpoint
+        user_id: ID of a currently registered account
+
+    Note:
+        Writes attribute: protocol.user_id
+    """
+    protocol.user_id = user_id
+    protocol.send_broadcast()
+
+
+def discovery_key(protocol: BroadcastProtocol) -> bytes:
+    """Return the AES key discovery replies are encrypted with.
+
+    Args:
+        protocol: The discovery endpoint
+
+    Note:
+        Reads library attribute: protocol.aes_key
+    """
+    return bytes(protocol.aes_key)
+
+
+def parse_discovery_reply(data: bytes, key: bytes) -> str | None:
+    """Decrypt a discovery reply and return the ID of the device it is from.
+
+    Safe to call from a worker thread: it uses python-aidot's own AES
+    function, which builds a cipher per call, never the timed replacement.
+
+    Args:
+        data: The reply datagram
+        key: Key from discovery_key()
+
+    Returns:
+        The device ID, or None for datagrams that are not device replies.
+
+    Note:
+        Mirrors the reply format read by BroadcastProtocol.datagram_received
+    """
+    try:
+        message = json.loads(aes_utils.aes_decrypt(data, key))
+    except ValueError:
+        return None
+    payload = message.get("payload") if isinstance(message, dict) else None
+    if not isinstance(payload, dict) or "mac" not in payload:
+        return None
+    return payload.get("devId")
 
 
 class DeviceClientWrapper:
@@ -42,6 +142,20 @@ class DeviceClientWrapper:
         """
         return getattr(self._client, "_ip_address", None)
 
+    def set_ip_address(self, ip_address: str) -> None:
+        """Set the device IP address without starting a login.
+
+        DeviceClient.update_ip_address() immediately schedules a login for
+        disconnected devices, which bypasses our admission control.
+
+        Args:
+            ip_address: The IP address reported by discovery
+
+        Note:
+            Writes private attribute: device_client._ip_address
+        """
+        self._client._ip_address = ip_address
+
     @property
     def is_connected(self) -> bool:
         """Check if device is connected and logged in.
@@ -60,82 +174,77 @@ class DeviceClientWrapper:
         """
         return self._client.connecting
 
-    @property
-    def unwrapped(self) -> DeviceClient:
-        """Get the underlying DeviceClient instance.
+    async def async_request_status(self) -> None:
+        """Ask the device to send its current status.
         
-        Returns:
-            The wrapped DeviceClient for direct access when needed.
+        DeviceClient.send_action() forces status.on to True when asked to
+        send attributes to a light that is off, so the local state is
+        restored after sending the request.
+        
+        Note:
+            Calls semi-private method: device_client.send_action
         """
-        return self._client
+        is_on = self._client.status.on
+        await self._client.send_action({}, "getDevAttrReq")
+        self._client.status.on = is_on
 
+    def set_frame_cb(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Call a function with the attributes of every status frame.
 
-class DiscoverWrapper:
-    """Wrapper for Discover that isolates private API access.
-    
-    This class provides safe access to discovery internals.
-    """
+        The status callback only receives the merged DeviceStatusData, which
+        cannot tell which attributes the frame carried. The function is
+        called before the status is updated.
 
-    def __init__(self, discover: Discover) -> None:
-        """Initialize the wrapper.
-        
         Args:
-            discover: The Discover instance to wrap
-        """
-        self._discover = discover
+            callback: Called with the frame's attributes in device units
 
-    @property
-    def discovered_devices(self) -> dict[str, Any]:
-        """Get the dictionary of discovered devices.
-        
-        Returns:
-            Dictionary mapping device IDs to discovery info.
-            
         Note:
-            Accesses private attribute: discover.discovered_device
+            Replaces method on the status object: device_client.status.update
         """
-        return getattr(self._discover, "discovered_device", {})
+        status = self._client.status
+
+        def update(attr: dict[str, Any] | None) -> None:
+            if attr:
+                callback(attr)
+            DeviceStatusData.update(status, attr)
+
+        status.update = update  # type: ignore[method-assign]
 
     @property
-    def broadcast_protocol(self) -> Any | None:
-        """Get the broadcast protocol instance.
-        
-        Returns:
-            The BroadcastProtocol instance, or None if not initialized.
-            
+    def has_session(self) -> bool:
+        """Check if a TCP session was ever opened for the device.
+
+        DeviceClient.close() logs an error for clients that never opened
+        one, which is the norm in lazy connection mode.
+
         Note:
-            Accesses private attribute: discover._broadcast_protocol
+            Accesses private attribute: device_client.writer
         """
-        return getattr(self._discover, "_broadcast_protocol", None)
+        return getattr(self._client, "writer", None) is not None
+
+    def stop(self) -> None:
+        """Stop the ping task of a client that never opened a session.
 
-    @property
-    def has_transport(self) -> bool:
-        """Check if a transport has been created.
-        
-        Returns:
-            True if transport exists, False otherwise.
-            
         Note:
-            Checks for private attribute: discover._transport
+            Writes private attribute: device_client._is_close
         """
-        return hasattr(self._discover, "_transport")
+        self._client._is_close = True
 
-    def get_transport(self) -> Any | None:
-        """Get the UDP transport if it exists.
+    def abort(self) -> None:
+        """Abort the device TCP session without waiting for it to close.
         
-        Returns:
-            The transport object, or None if not created.
-            
         Note:
-            Accesses private attribute: discover._transport
+            Accesses private attribute: device_client.writer
         """
-        return getattr(self._discover, "_transport", None)
+        writer = getattr(self._client, "writer", None)
+        if writer is not None:
+            writer.transport.abort()
 
     @property
-    def unwrapped(self) -> Discover:
-        """Get the underlying Discover instance.
+    def unwrapped(self) -> DeviceClient:
+        """Get the underlying DeviceClient instance.
         
         Returns:
-            The wrapped Discover for direct access when needed.
+            The wrapped DeviceClient for direct access when needed.
         """
-        return self._discover
+        return self._client
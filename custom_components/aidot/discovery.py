@@ -0,0 +1,347 @@
+"""Local discovery shared by all Aidot config entries.
+
+Each AiDot account used to open its own UDP broadcast socket, broadcast
+the same subnet and run its own reconnect loop. The hub in this module is
+a singleton stored in hass.data[DOMAIN]: it owns one discovery endpoint per
+source interface, sends one broadcast for all entries and routes every
+reply to the entry that owns the device. It is reference counted so it is
+created with the first entry and torn down with the last one.
+
+Every broadcast is answered by every device, so most replies repeat what
+is already known. Replies with an unchanged IP address are dropped for
+DISCOVERY_DEDUP_WINDOW after a device was last acted on; the remaining
+replies are collected for DISCOVERY_BATCH_DELAY and handed to each entry
+as one batch.
+
+Replies are decrypted by the hub's ReplyOffloader instead of the
+protocol, so they move to a thread pool when they load the event loop.
+While an entry has performance statistics enabled, the hub also owns the
+CryptoMonitor that times python-aidot's AES calls; it is installed with
+the first such entry and removed with the last one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from homeassistant.components.network import async_get_source_ip
+from homeassistant.core import HomeAssistant, callback
+
+from aidot.const import CONF_ID
+from aidot.discover import BroadcastProtocol
+
+from .const import (
+    DISCOVERY_BATCH_DELAY,
+    DISCOVERY_BROADCAST_COALESCE,
+    DISCOVERY_DEDUP_WINDOW,
+    DISCOVERY_REPEAT_INTERVAL,
+    DOMAIN,
+    RECONNECT_INTERVAL,
+)
+from .crypto import CryptoMonitor, ReplyOffloader
+from .device_wrapper import (
+    discovery_key,
+    install_crypto,
+    send_broadcast,
+    uninstall_crypto,
+)
+from .profiling import CallsiteStats
+
+_LOGGER = logging.getLogger(__name__)
+
+type DiscoveryCallback = Callable[[dict[str, str]], None]
+type SupervisorCallback = Callable[[], bool]
+
+
+class _OffloadingBroadcastProtocol(BroadcastProtocol):
+    """Broadcast protocol that leaves reply decryption to an offloader."""
+
+    def __init__(self, user_id: str, offloader: ReplyOffloader) -> None:
+        """Initialize the protocol."""
+        super().__init__(None, user_id)
+        self._offloader = offloader
+        self._key = discovery_key(self)
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Hand a reply to the offloader."""
+        self._offloader.handle(data, addr[0], self._key)
+
+
+@dataclass(slots=True)
+class _Subscriber:
+    """A config entry registered with the hub."""
+
+    user_id: str
+    on_discovery: DiscoveryCallback
+    on_supervise: SupervisorCallback
+    device_ids: set[str] = field(default_factory=set)
+
+
+class AidotDiscoveryHub:
+    """Discovery endpoints and reconnect supervisor shared across entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.discovered_devices: dict[str, str] = {}
+        self.broadcasts_sent = 0
+        self.replies_received = 0
+        self.replies_acted = 0
+        # Time from the last broadcast to each reply
+        self.reply_latency = CallsiteStats()
+        self.crypto: CryptoMonitor | None = None
+        self.offloader = ReplyOffloader(hass, self._handle_reply)
+        # Entries with performance statistics enabled
+        self._profiling: set[str] = set()
+        self._subscribers: dict[str, _Subscriber] = {}
+        self._owners: dict[str, set[str]] = {}
+        self._endpoints: dict[str, BroadcastProtocol] = {}
+        self._last_broadcast = 0.0
+        # Event loop time each device was last acted on
+        self._last_acted: dict[str, float] = {}
+        # Device ID -> IP address of replies waiting to be handed out
+        self._pending: dict[str, str] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def entry_count(self) -> int:
+        """Return the number of registered config entries."""
+        return len(self._subscribers)
+
+    async def async_register(
+        self,
+        entry_id: str,
+        login_info: dict[str, Any],
+        on_discovery: DiscoveryCallback,
+        on_supervise: SupervisorCallback,
+        profiling: bool = False,
+    ) -> None:
+        """Register a config entry and start discovery if needed.
+
+        Args:
+            entry_id: The config entry ID
+            login_info: Login info of the entry's account
+            on_discovery: Called with {dev_id: ip_address} for owned devices
+            on_supervise: Called every reconnect interval, returns True if
+                the entry has disconnected devices that need a broadcast
+            profiling: Time python-aidot's AES calls while the entry is loaded
+        """
+        self._subscribers[entry_id] = _Subscriber(
+            login_info[CONF_ID], on_discovery, on_supervise
+        )
+        if profiling:
+            self._profiling.add(entry_id)
+            if self.crypto is None:
+                self.crypto = CryptoMonitor()
+                install_crypto(self.crypto)
+        try:
+            async with self._lock:
+                source_ip = await async_get_source_ip(self.hass) or "0.0.0.0"
+                if source_ip not in self._endpoints:
+                    await self._async_create_endpoint(source_ip, login_info[CONF_ID])
+        except Exception:
+            self.async_unregister(entry_id)
+            raise
+
+        if not self._tasks:
+            self._tasks = [
+                self.hass.async_create_background_task(
+                    self._async_repeat_broadcast(), f"{DOMAIN} discovery broadcast"
+                ),
+                self.hass.async_create_background_task(
+                    self._async_supervise(), f"{DOMAIN} reconnect supervisor"
+                ),
+            ]
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Unregister a config entry."""
+        if (subscriber := self._subscribers.pop(entry_id, None)) is None:
+            return
+        self._set_owned(entry_id, subscriber, set())
+        self._profiling.discard(entry_id)
+        if not self._profiling:
+            self._uninstall_crypto()
+
+    @callback
+    def _uninstall_crypto(self) -> None:
+        """Give python-aidot its own AES functions back."""
+        if self.crypto is None:
+            return
+        uninstall_crypto()
+        self.crypto.clear()
+        self.crypto = None
+
+    @callback
+    def async_set_devices(self, entry_id: str, device_ids: set[str]) -> None:
+        """Set the device IDs whose discovery replies go to an entry."""
+        if (subscriber := self._subscribers.get(entry_id)) is not None:
+            self._set_owned(entry_id, subscriber, device_ids)
+
+    def _set_owned(
+        self, entry_id: str, subscriber: _Subscriber, device_ids: set[str]
+    ) -> None:
+        """Update the owner index for an entry."""
+        for dev_id in subscriber.device_ids - device_ids:
+            owners = self._owners.get(dev_id)
+            if owners is not None:
+                owners.discard(entry_id)
+                if not owners:
+                    del self._owners[dev_id]
+        for dev_id in device_ids - subscriber.device_ids:
+            self._owners.setdefault(dev_id, set()).add(entry_id)
+        subscriber.device_ids = set(device_ids)
+
+    async def _async_create_endpoint(self, source_ip: str, user_id: str) -> None:
+        """Create a broadcast endpoint bound to the given interface.
+
+        The user ID only seeds the protocol, each broadcast is sent on
+        behalf of an entry registered at that time. If binding fails, the
+        endpoint on 0.0.0.0 is created or reused and recorded under the
+        requested address as well, so later registrations do not retry.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            _, protocol = await loop.create_datagram_endpoint(
+                lambda: _OffloadingBroadcastProtocol(user_id, self.offloader),
+                local_addr=(source_ip, 0),
+            )
+        except OSError as e:
+            if source_ip == "0.0.0.0":
+                raise
+            _LOGGER.error(
+                "Failed to bind discovery to %s: %s. Falling back to default.",
+                source_ip,
+                e,
+            )
+            if "0.0.0.0" not in self._endpoints:
+                await self._async_create_endpoint("0.0.0.0", user_id)
+            self._endpoints[source_ip] = self._endpoints["0.0.0.0"]
+            return
+
+        self._endpoints[source_ip] = protocol
+        _LOGGER.info(
+            "Discovery bound to %s (will send broadcasts from this address)",
+            source_ip,
+        )
+
+    def _unique_endpoints(self) -> list[BroadcastProtocol]:
+        """Return each endpoint once, fallbacks share the 0.0.0.0 endpoint."""
+        return list(dict.fromkeys(self._endpoints.values()))
+
+    @callback
+    def _handle_reply(self, dev_id: str, event: dict[str, str]) -> None:
+        """Queue a discovery reply unless it repeats what is known."""
+        now = self.hass.loop.time()
+        self.replies_received += 1
+        self.reply_latency.record(now - self._last_broadcast)
+        ip_address = event["ipAddress"]
+        if (
+            self.discovered_devices.get(dev_id) == ip_address
+            and now - self._last_acted.get(dev_id, 0.0) < DISCOVERY_DEDUP_WINDOW
+        ):
+            return
+        self.replies_acted += 1
+        self._last_acted[dev_id] = now
+        self.discovered_devices[dev_id] = ip_address
+        self._pending[dev_id] = ip_address
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                DISCOVERY_BATCH_DELAY, self._flush_replies
+            )
+
+    @callback
+    def _flush_replies(self) -> None:
+        """Hand queued replies to the entries that own the devices."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        batches: dict[str, dict[str, str]] = {}
+        for dev_id, ip_address in pending.items():
+            for entry_id in self._owners.get(dev_id, ()):
+                batches.setdefault(entry_id, {})[dev_id] = ip_address
+        for entry_id, devices in batches.items():
+            self._subscribers[entry_id].on_discovery(devices)
+
+    @callback
+    def async_broadcast(self) -> None:
+        """Send a discovery broadcast on every endpoint.
+
+        Requests arriving within a short window of the previous broadcast
+        are coalesced into it, so several entries asking at the same time
+        result in a single broadcast.
+        """
+        now = self.hass.loop.time()
+        if (
+            not self._subscribers
+            or now - self._last_broadcast < DISCOVERY_BROADCAST_COALESCE
+        ):
+            return
+        self._last_broadcast = now
+        # The broadcast's source address, any registered account will do
+        user_id = next(iter(self._subscribers.values())).user_id
+        for protocol in self._unique_endpoints():
+            send_broadcast(protocol, user_id)
+            self.broadcasts_sent += 1
+
+    async def _async_repeat_broadcast(self) -> None:
+        """Broadcast periodically to keep device IPs up to date."""
+        while True:
+            self.async_broadcast()
+            await asyncio.sleep(DISCOVERY_REPEAT_INTERVAL)
+
+    async def _async_supervise(self) -> None:
+        """Periodically let each entry check its devices' connections."""
+        while True:
+            await asyncio.sleep(RECONNECT_INTERVAL)
+            needs_broadcast = False
+            for entry_id, subscriber in list(self._subscribers.items()):
+                try:
+                    needs_broadcast |= subscriber.on_supervise()
+                except Exception:
+                    _LOGGER.exception(
+                        "Reconnect check failed for entry %s", entry_id
+                    )
+            if needs_broadcast:
+                self.async_broadcast()
+
+    @callback
+    def async_close(self) -> None:
+        """Stop broadcasting and close all endpoints."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for protocol in self._unique_endpoints():
+            protocol.close()
+        self._endpoints.clear()
+        self.offloader.shutdown()
+        self._uninstall_crypto()
+        _LOGGER.debug("Closed discovery UDP transport(s)")
+
+
+@callback
+def async_get_discovery_hub(hass: HomeAssistant) -> AidotDiscoveryHub:
+    """Return the shared discovery hub, creating it if needed."""
+    if (hub := hass.data.get(DOMAIN)) is None:
+        hub = hass.data[DOMAIN] = AidotDiscoveryHub(hass)
+    return hub
+
+
+@callback
+def async_release_discovery_hub(hass: HomeAssistant, entry_id: str) -> None:
+    """Unregister an entry and tear the hub down after the last one."""
+    hub: AidotDiscoveryHub | None = hass.data.get(DOMAIN)
+    if hub is None:
+        return
+    hub.async_unregister(entry_id)
+    if hub.entry_count == 0:
+        hub.async_close()
+        del hass.data[DOMAIN]
@@ -0,0 +1,150 @@
+"""Adaptive per-device timeouts for Aidot devices.
+
+Bulbs close to an access point answer within milliseconds while bulbs on
+a distant mesh node can take several seconds. Instead of one global
+timeout, each device gets a smoothed round-trip estimate and a timeout
+derived from it, using the retransmission timer from RFC 6298.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONNECTION_TIMEOUT,
+    DOMAIN,
+    LATENCY_MAX_BACKOFF,
+    LATENCY_MAX_TIMEOUT,
+    LATENCY_MIN_TIMEOUT,
+    LATENCY_SAVE_DELAY,
+    STATUS_WAIT_TIMEOUT,
+)
+
+STORAGE_VERSION = 1
+
+_ALPHA = 1 / 8  # gain for the smoothed round-trip time
+_BETA = 1 / 4  # gain for the round-trip variance
+_K = 4  # variance multiplier
+
+
+class LatencyEstimator:
+    """Smoothed round-trip time and variance estimator."""
+
+    def __init__(self, initial_timeout: float) -> None:
+        """Initialize the estimator.
+
+        Args:
+            initial_timeout: Timeout to use until the first sample arrives
+        """
+        self._initial_timeout = initial_timeout
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self.samples = 0
+        self.timeouts = 0
+        self._backoff = 1.0
+
+    @property
+    def timeout(self) -> float:
+        """Return the timeout to use for the next attempt."""
+        if self.srtt is None or self.rttvar is None:
+            base = self._initial_timeout
+        else:
+            base = self.srtt + _K * self.rttvar
+        return min(
+            LATENCY_MAX_TIMEOUT, max(LATENCY_MIN_TIMEOUT, base) * self._backoff
+        )
+
+    def add_sample(self, rtt: float) -> None:
+        """Feed a measured round-trip time into the estimator."""
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - _BETA) * self.rttvar + _BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - _ALPHA) * self.srtt + _ALPHA * rtt
+        self.samples += 1
+        self._backoff = 1.0
+
+    def record_timeout(self) -> None:
+        """Back off after an attempt that timed out."""
+        self.timeouts += 1
+        self._backoff = min(LATENCY_MAX_BACKOFF, self._backoff * 2)
+
+    def as_dict(self) -> dict[str, float] | None:
+        """Return the persisted form of the estimate."""
+        if self.srtt is None or self.rttvar is None:
+            return None
+        return {"srtt": self.srtt, "rttvar": self.rttvar}
+
+    def restore(self, data: dict[str, float]) -> None:
+        """Seed the estimator from persisted history."""
+        self.srtt = data["srtt"]
+        self.rttvar = data["rttvar"]
+
+
+class DeviceLatency:
+    """Latency estimators for the operations performed on one device."""
+
+    def __init__(self) -> None:
+        """Initialize the estimators."""
+        # Login covers TCP connect plus the login handshake
+        self.login = LatencyEstimator(CONNECTION_TIMEOUT)
+        # Status covers a single request/response on an open session
+        self.status = LatencyEstimator(STATUS_WAIT_TIMEOUT)
+
+
+class LatencyTracker:
+    """Per-device latency estimators with persisted history."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the tracker."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.latency"
+        )
+        self._devices: dict[str, DeviceLatency] = {}
+        self._history: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        """Load latency history from storage."""
+        self._history = await self._store.async_load() or {}
+
+    def get(self, dev_id: str) -> DeviceLatency:
+        """Return the estimators for a device, seeding them from history."""
+        if (latency := self._devices.get(dev_id)) is None:
+            latency = self._devices[dev_id] = DeviceLatency()
+            history = self._history.get(dev_id, {})
+            if login := history.get("login"):
+                latency.login.restore(login)
+            if status := history.get("status"):
+                latency.status.restore(status)
+        return latency
+
+    def remove(self, dev_id: str) -> None:
+        """Forget a device that was removed from the account."""
+        self._devices.pop(dev_id, None)
+        self._history.pop(dev_id, None)
+        self.async_schedule_save()
+
+    def async_schedule_save(self) -> None:
+        """Schedule writing the latency history to storage."""
+        self._store.async_delay_save(self._data_to_save, LATENCY_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write the latency history to storage now."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the stored latency history."""
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the latency history to store."""
+        for dev_id, latency in self._devices.items():
+            self._history[dev_id] = {
+                "login": latency.login.as_dict(),
+                "status": latency.status.as_dict(),
+            }
+        return self._history
@@ -10,9 +10,9 @@ from homeassistant.components.light import (
     ColorMode,
     LightEntity,
 )
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import (
     CONNECTION_NETWORK_MAC,
     DeviceInfo,
@@ -23,13 +23,15 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from aidot.const import CONF_CCT, CONF_DIMMING, CONF_ON_OFF, CONF_RGBW
 
+from .command_queue import CommandLane
 from .const import DOMAIN
 from .coordinator import AidotConfigEntry, AidotDeviceUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
-# Limit concurrent updates to prevent command conflicts
-PARALLEL_UPDATES = 1
+# Commands are serialized per device by the coordinator's priority queue,
+# so entities do not need to wait for each other
+PARALLEL_UPDATES = 0
 
 
 async def async_setup_entry(
@@ -38,36 +40,11 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Light."""
-    coordinator = entry.runtime_data
-    lists_added: set[str] = set()
-
-    @callback
-    def add_entities() -> None:
-        """Add light entities."""
-        nonlocal lists_added
-        new_lists = {
-            device_coordinator.device_client.device_id
-            for device_coordinator in coordinator.device_coordinators.values()
-        }
-
-        if new_lists - lists_added:
-            async_add_entities(
-                AidotLight(coordinator.device_coordinators[device_id])
-                for device_id in new_lists
-            )
-            lists_added |= new_lists
-        elif lists_added - new_lists:
-            removed_device_ids = lists_added - new_lists
-            for device_id in removed_device_ids:
-                entity_registry = er.async_get(hass)
-                if entity := entity_registry.async_get_entity_id(
-                    "light", DOMAIN, device_id
-                ):
-                    entity_registry.async_remove(entity)
-            lists_added = lists_added - removed_device_ids
-
-    coordinator.async_add_listener(add_entities)
-    add_entities()
+    entry.runtime_data.reconciler.async_add_platform(
+        Platform.LIGHT,
+        lambda device_coordinator: [AidotLight(device_coordinator)],
+        async_add_entities,
+    )
 
 
 class AidotLight(CoordinatorEntity[AidotDeviceUpdateCoordinator], LightEntity):
@@ -114,7 +91,7 @@ class AidotLight(CoordinatorEntity[AidotDeviceUpdateCoordinator], LightEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return self.coordinator.is_connected
+        return self.coordinator.available
 
     def _update_status(self) -> None:
         """Update entity state from coordinator data."""
@@ -130,6 +107,17 @@ class AidotLight(CoordinatorEntity[AidotDeviceUpdateCoordinator], LightEntity):
         self._update_status()
         super()._handle_coordinator_update()
 
+    def _command_lane(self) -> CommandLane:
+        """Return the priority lane for the current service call.
+
+        Calls made directly by a user (dashboard, app) have a user ID and no
+        parent context; everything else comes from automations or scripts.
+        """
+        context = self._context
+        if context is not None and context.user_id and context.parent_id is None:
+            return CommandLane.INTERACTIVE
+        return CommandLane.AUTOMATION
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
         attrs = {CONF_ON_OFF: 1}
@@ -151,7 +139,11 @@ class AidotLight(CoordinatorEntity[AidotDeviceUpdateCoordinator], LightEntity):
         self.async_write_ha_state()
 
         try:
-            await self.coordinator.device_client.send_dev_attr(attrs)
+            # Returns once a status frame confirmed the command or its ack
+            # timed out, which keeps the optimistic state
+            await self.coordinator.async_send_dev_attr(
+                attrs, self._command_lane(), wait_for_ack=True
+            )
         except ConnectionError as err:
             # Revert optimistic state on failure
             self.coordinator.data.on = False
@@ -173,7 +165,9 @@ class AidotLight(CoordinatorEntity[AidotDeviceUpdateCoordinator], LightEntity):
         self.async_write_ha_state()
 
         try:
-            await self.coordinator.device_client.send_dev_attr({CONF_ON_OFF: 0})
+            await self.coordinator.async_send_dev_attr(
+                {CONF_ON_OFF: 0}, self._command_lane(), wait_for_ack=True
+            )
         except ConnectionError as err:
             # Revert optimistic state on failure
             self.coordinator.data.on = True
@@ -0,0 +1,490 @@
+"""Prometheus metrics for the Aidot integration.
+
+Entries with the metrics option enabled are exported in the Prometheus
+text format at METRICS_URL. All values are counters the coordinators,
+discovery hub, command queues and session pool already keep; rendering
+happens only when the endpoint is scraped.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from http import HTTPStatus
+import math
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+
+from .cloud import CircuitState
+from .command_queue import CommandLane
+from .const import CONF_METRICS, DATA_METRICS_VIEW, DOMAIN, METRICS_URL
+from .profiling import HISTOGRAM_BUCKETS, CallsiteStats
+
+if TYPE_CHECKING:
+    from .coordinator import AidotDeviceManagerCoordinator
+    from .discovery import AidotDiscoveryHub
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@callback
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Register the metrics view unless it already is."""
+    if hass.data.get(DATA_METRICS_VIEW):
+        return
+    hass.data[DATA_METRICS_VIEW] = True
+    hass.http.register_view(AidotMetricsView)
+
+
+class AidotMetricsView(HomeAssistantView):
+    """Serve integration metrics to Prometheus."""
+
+    url = METRICS_URL
+    name = "api:aidot:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the metrics of all entries that export them."""
+        hass = request.app[KEY_HASS]
+        coordinators = [
+            entry.runtime_data
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+            and entry.options.get(CONF_METRICS, False)
+        ]
+        if not coordinators:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        hub: AidotDiscoveryHub | None = hass.data.get(DOMAIN)
+        return web.Response(
+            body=render_metrics(coordinators, hub).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+
+class _MetricFamilies:
+    """Collect samples grouped by metric name."""
+
+    def __init__(self) -> None:
+        """Initialize the collection."""
+        self._families: dict[str, tuple[str, str, list[str]]] = {}
+
+    def add(
+        self,
+        name: str,
+        kind: str,
+        doc: str,
+        value: float,
+        labels: dict[str, str],
+        suffix: str = "",
+    ) -> None:
+        """Add a sample to a metric family."""
+        family = self._families.setdefault(name, (kind, doc, []))
+        family[2].append(
+            f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+        )
+
+    def add_histogram(
+        self,
+        name: str,
+        doc: str,
+        stats: Iterable[CallsiteStats],
+        labels: dict[str, str],
+    ) -> None:
+        """Add a histogram merged from one or more callsite statistics."""
+        buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        count = 0
+        total = 0.0
+        for item in stats:
+            count += item.count
+            total += item.total
+            for index, bucket_count in enumerate(item.buckets):
+                buckets[index] += bucket_count
+        cumulative = 0
+        for bound, bucket_count in zip(
+            (*(f"{bound:g}" for bound in HISTOGRAM_BUCKETS), "+Inf"), buckets
+        ):
+            cumulative += bucket_count
+            self.add(
+                name, "histogram", doc, cumulative, {**labels, "le": bound}, "_bucket"
+            )
+        self.add(name, "histogram", doc, total, labels, "_sum")
+        self.add(name, "histogram", doc, count, labels, "_count")
+
+    def render(self) -> str:
+        """Return the text exposition of all families."""
+        lines: list[str] = []
+        for name, (kind, doc, samples) in self._families.items():
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    """Format a label set, escaping values as the text format requires."""
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for key, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, spelling non-finite values as the text format does."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def render_metrics(
+    coordinators: Iterable[AidotDeviceManagerCoordinator],
+    hub: AidotDiscoveryHub | None,
+) -> str:
+    """Render metrics for the given entries and the shared discovery hub."""
+    metrics = _MetricFamilies()
+    if hub is not None:
+        metrics.add(
+            "aidot_discovery_broadcasts_total",
+            "counter",
+            "Discovery broadcasts sent.",
+            hub.broadcasts_sent,
+            {},
+        )
+        metrics.add(
+            "aidot_discovery_replies_total",
+            "counter",
+            "Discovery replies received.",
+            hub.replies_received,
+            {},
+        )
+        metrics.add(
+            "aidot_discovery_replies_acted_total",
+            "counter",
+            "Discovery replies that were not repeats of a known address.",
+            hub.replies_acted,
+            {},
+        )
+        metrics.add_histogram(
+            "aidot_discovery_reply_latency_seconds",
+            "Time from the last discovery broadcast to a reply.",
+            [hub.reply_latency],
+            {},
+        )
+        offloader = hub.offloader
+        metrics.add(
+            "aidot_discovery_offloading",
+            "gauge",
+            "Whether discovery replies are decrypted in the thread pool.",
+            int(offloader.offloading),
+            {},
+        )
+        metrics.add(
+            "aidot_discovery_replies_offloaded_total",
+            "counter",
+            "Discovery replies decrypted in the thread pool.",
+            offloader.offloaded,
+            {},
+        )
+        metrics.add(
+            "aidot_discovery_replies_dropped_total",
+            "counter",
+            "Discovery replies dropped because the thread pool queue was full.",
+            offloader.dropped,
+            {},
+        )
+        metrics.add(
+            "aidot_crypto_loop_saved_seconds_total",
+            "counter",
+            "Decryption time moved from the event loop to the thread pool.",
+            offloader.loop_time_saved,
+            {},
+        )
+        if (crypto := hub.crypto) is not None:
+            for operation, stats in (
+                ("encrypt", crypto.encrypt),
+                ("decrypt", crypto.decrypt),
+            ):
+                metrics.add_histogram(
+                    "aidot_crypto_seconds",
+                    "AES work done on the event loop per frame.",
+                    [stats],
+                    {"operation": operation},
+                )
+            metrics.add(
+                "aidot_crypto_loop_load",
+                "gauge",
+                "Share of event loop time spent in AES.",
+                crypto.load,
+                {},
+            )
+
+    for coordinator in coordinators:
+        # Titles need not be unique, series are keyed by the entry ID
+        labels = {"entry_id": coordinator.config_entry.entry_id}
+        metrics.add(
+            "aidot_entry_info",
+            "gauge",
+            "Config entry exporting metrics, with its title.",
+            1,
+            {**labels, "title": coordinator.config_entry.title},
+        )
+        devices = list(coordinator.device_coordinators.values())
+        metrics.add(
+            "aidot_devices_known",
+            "gauge",
+            "Lights in the cloud account.",
+            len(devices),
+            labels,
+        )
+        metrics.add(
+            "aidot_devices_connected",
+            "gauge",
+            "Lights with an open, logged-in session.",
+            sum(device.is_connected for device in devices),
+            labels,
+        )
+        metrics.add(
+            "aidot_connection_attempts_total",
+            "counter",
+            "Device connection attempts.",
+            coordinator.connection_attempts,
+            labels,
+        )
+        metrics.add(
+            "aidot_connection_failures_total",
+            "counter",
+            "Device connection attempts that failed.",
+            coordinator.connection_failures,
+            labels,
+        )
+        metrics.add(
+            "aidot_connection_retries_total",
+            "counter",
+            "Connection attempts for devices whose previous attempt failed.",
+            coordinator.connection_retries,
+            labels,
+        )
+        for operation in ("login", "status"):
+            metrics.add(
+                "aidot_timeouts_total",
+                "counter",
+                "Operations that exceeded their adaptive timeout.",
+                sum(
+                    getattr(device.latency, operation).timeouts for device in devices
+                ),
+                {**labels, "operation": operation},
+            )
+        metrics.add(
+            "aidot_ip_changes_total",
+            "counter",
+            "Device IP address changes seen by discovery.",
+            coordinator.ip_changes,
+            labels,
+        )
+        metrics.add(
+            "aidot_storm_recovering",
+            "gauge",
+            "1 while reconnects are rate limited after a connection storm.",
+            int(coordinator.storm_guard.recovering),
+            labels,
+        )
+        metrics.add(
+            "aidot_status_frames_total",
+            "counter",
+            "Status frames received from devices.",
+            sum(device.status_frames for device in devices),
+            labels,
+        )
+        metrics.add_histogram(
+            "aidot_command_rtt_seconds",
+            "Time from sending a command to the status frame confirming it.",
+            (device.command_rtt for device in devices),
+            labels,
+        )
+        metrics.add(
+            "aidot_commands_acked_total",
+            "counter",
+            "Commands confirmed by a device status frame.",
+            sum(device.acks.acked for device in devices),
+            labels,
+        )
+        metrics.add(
+            "aidot_commands_lost_total",
+            "counter",
+            "Commands not confirmed within the adaptive status timeout.",
+            sum(device.acks.lost for device in devices),
+            labels,
+        )
+        metrics.add(
+            "aidot_commands_in_flight",
+            "gauge",
+            "Commands sent and not yet confirmed.",
+            sum(device.acks.in_flight for device in devices),
+            labels,
+        )
+        for lane in CommandLane:
+            lane_stats = [device.commands.lane_stats[lane] for device in devices]
+            lane_labels = {**labels, "lane": lane.name.lower()}
+            metrics.add(
+                "aidot_commands_sent_total",
+                "counter",
+                "Commands sent per priority lane.",
+                sum(stats.sent for stats in lane_stats),
+                lane_labels,
+            )
+            metrics.add(
+                "aidot_commands_superseded_total",
+                "counter",
+                "Queued commands dropped because a user command overwrote them.",
+                sum(stats.superseded for stats in lane_stats),
+                lane_labels,
+            )
+            metrics.add(
+                "aidot_command_queue_wait_seconds_total",
+                "counter",
+                "Time commands spent waiting in the device queues.",
+                sum(stats.total_wait for stats in lane_stats),
+                lane_labels,
+            )
+        metrics.add_histogram(
+            "aidot_cloud_refresh_seconds",
+            "Duration of device list refreshes from the cloud.",
+            [coordinator.cloud_refresh],
+            labels,
+        )
+        metrics.add(
+            "aidot_cloud_circuit_open",
+            "gauge",
+            "1 while cloud calls are paused after repeated failures.",
+            int(coordinator.cloud.state is not CircuitState.CLOSED),
+            labels,
+        )
+        metrics.add(
+            "aidot_cloud_calls_rejected_total",
+            "counter",
+            "Cloud calls skipped while the circuit was open.",
+            coordinator.cloud.rejected,
+            labels,
+        )
+        for group in coordinator.admission.groups.values():
+            group_labels = {**labels, "group": group.name}
+            metrics.add(
+                "aidot_group_in_flight",
+                "gauge",
+                "Logins and commands in flight per admission group.",
+                group.in_flight,
+                group_labels,
+            )
+            metrics.add_histogram(
+                "aidot_group_admission_wait_seconds",
+                "Time operations waited for admission per group.",
+                [group.wait],
+                group_labels,
+            )
+            for operation, stats in group.operations.items():
+                operation_labels = {**group_labels, "operation": operation}
+                metrics.add(
+                    "aidot_group_operations_total",
+                    "counter",
+                    "Logins, commands and status requests per admission group.",
+                    stats.attempts,
+                    operation_labels,
+                )
+                metrics.add(
+                    "aidot_group_operation_failures_total",
+                    "counter",
+                    "Operations that failed or timed out per admission group.",
+                    stats.failures,
+                    operation_labels,
+                )
+                metrics.add_histogram(
+                    "aidot_group_operation_seconds",
+                    "Duration of admitted operations per group.",
+                    [stats.latency],
+                    operation_labels,
+                )
+        circadian = coordinator.circadian
+        metrics.add(
+            "aidot_circadian_lights",
+            "gauge",
+            "Lights enrolled in circadian lighting.",
+            circadian.enrolled,
+            labels,
+        )
+        metrics.add(
+            "aidot_circadian_paused_lights",
+            "gauge",
+            "Enrolled lights paused after a manual change.",
+            circadian.paused,
+            labels,
+        )
+        metrics.add(
+            "aidot_circadian_updates_total",
+            "counter",
+            "Circadian updates sent to lights.",
+            circadian.updates_sent,
+            labels,
+        )
+        metrics.add(
+            "aidot_circadian_updates_skipped_total",
+            "counter",
+            "Circadian updates skipped because the quantized target was unchanged.",
+            circadian.updates_skipped,
+            labels,
+        )
+        metrics.add(
+            "aidot_circadian_overrides_total",
+            "counter",
+            "Manual changes that paused circadian lighting on a light.",
+            circadian.overrides,
+            labels,
+        )
+        if (poller := coordinator.poller) is not None:
+            metrics.add(
+                "aidot_status_polls_total",
+                "counter",
+                "Status polls sent.",
+                poller.polls,
+                labels,
+            )
+            metrics.add(
+                "aidot_status_poll_timeouts_total",
+                "counter",
+                "Status polls without a reply in time.",
+                poller.timeouts,
+                labels,
+            )
+        if (pool := coordinator.session_pool) is not None:
+            metrics.add(
+                "aidot_sessions_open",
+                "gauge",
+                "Open device sessions in lazy mode.",
+                pool.open_count,
+                labels,
+            )
+            metrics.add(
+                "aidot_sessions_evicted_total",
+                "counter",
+                "Sessions closed to stay under the session cap.",
+                pool.evicted,
+                labels,
+            )
+        for name, stats in coordinator.profiler.stats.items():
+            metrics.add_histogram(
+                "aidot_hot_path_seconds",
+                "Duration of timed hot paths, with profiling enabled.",
+                [stats],
+                {**labels, "callsite": name},
+            )
+    return metrics.render()
@@ -0,0 +1,111 @@
+"""Fixed-interval status polling for Aidot devices.
+
+Bulbs push their status when it changes, but pushes are occasionally
+missed (for example when a bulb is switched from the app). The poller
+queries every connected device once per interval. Queries are spread
+evenly over the interval instead of being sent at once, at most a fixed
+number are outstanding, devices that pushed status recently are skipped
+and the pace is slowed down while the event loop is lagging.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+import logging
+from typing import TYPE_CHECKING
+
+from .const import POLL_LAG_THRESHOLD, POLL_MAX_STRETCH
+
+if TYPE_CHECKING:
+    from .coordinator import AidotDeviceUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StatusPoller:
+    """Spread status queries for all devices evenly across an interval."""
+
+    def __init__(
+        self,
+        interval: float,
+        concurrency: int,
+        get_devices: Callable[[], Iterable[AidotDeviceUpdateCoordinator]],
+    ) -> None:
+        """Initialize the poller.
+
+        Args:
+            interval: Seconds within which every device is queried once
+            concurrency: Maximum number of outstanding queries
+            get_devices: Returns the device coordinators to poll
+        """
+        self.interval = interval
+        self._get_devices = get_devices
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._stretch = 1.0
+        self._tasks: set[asyncio.Task] = set()
+        self.polls = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.loop_lag = 0.0
+
+    async def async_run(self) -> None:
+        """Poll devices until cancelled."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                cycle_start = loop.time()
+                now = cycle_start
+                due = []
+                for coordinator in self._get_devices():
+                    if not coordinator.is_connected:
+                        continue
+                    # Replies to earlier polls do not count, or every device
+                    # would only be polled every other cycle
+                    if now - coordinator.last_push_time < self.interval:
+                        # Pushed status recently, no need to ask
+                        self.skipped += 1
+                        continue
+                    due.append(coordinator)
+
+                slot = self.interval / max(1, len(due))
+                for coordinator in due:
+                    await self._semaphore.acquire()
+                    task = loop.create_task(self._async_poll(coordinator))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    await self._async_pace(slot * self._stretch)
+
+                # Wait out the rest of the cycle
+                remaining = cycle_start + self.interval * self._stretch - loop.time()
+                if remaining > 0:
+                    await self._async_pace(remaining)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    async def _async_pace(self, delay: float) -> None:
+        """Sleep and adjust the pace to the observed event-loop lag."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(delay)
+        self.loop_lag = max(0.0, loop.time() - start - delay)
+        if self.loop_lag > POLL_LAG_THRESHOLD:
+            self._stretch = min(POLL_MAX_STRETCH, self._stretch * 1.5)
+        elif self._stretch > 1.0:
+            self._stretch = max(1.0, self._stretch * 0.9)
+
+    async def _async_poll(self, coordinator: AidotDeviceUpdateCoordinator) -> None:
+        """Query one device and release the concurrency slot."""
+        try:
+            self.polls += 1
+            if not await coordinator.async_poll_status():
+                self.timeouts += 1
+        except ConnectionError as err:
+            _LOGGER.debug(
+                "Status poll failed for %s: %s",
+                coordinator.device_client.device_id,
+                err,
+            )
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,198 @@
+"""Hot-path timing and profiling for the Aidot integration.
+
+When enabled, the integration's hot paths (discovery replies, status
+frames, device list refreshes, reconnect checks and entity state writes)
+are timed and aggregated into per-callsite counters and histograms, and
+an event-loop lag monitor samples how late the loop wakes up. When
+disabled, a timed call costs one attribute check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import functools
+import logging
+import pstats
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, LAG_SAMPLE_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets in seconds
+HISTOGRAM_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+@dataclass(slots=True)
+class CallsiteStats:
+    """Timing statistics for one callsite."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    # Non-cumulative counts per bucket, the last one is +Inf
+    buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    )
+
+    def record(self, duration: float) -> None:
+        """Add a measured duration."""
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        for index, bound in enumerate(HISTOGRAM_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its histogram bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bound in enumerate(HISTOGRAM_BUCKETS):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for diagnostics and service responses."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class HotPathProfiler:
+    """Per-callsite timing statistics."""
+
+    def __init__(self, enabled: bool) -> None:
+        """Initialize the profiler."""
+        self.enabled = enabled
+        self.stats: dict[str, CallsiteStats] = {}
+
+    def record(self, name: str, duration: float) -> None:
+        """Record a duration for a callsite."""
+        if (stats := self.stats.get(name)) is None:
+            stats = self.stats[name] = CallsiteStats()
+        stats.record(duration)
+
+    async def async_monitor_loop_lag(self) -> None:
+        """Sample how late the event loop wakes up until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.record(
+                "event_loop_lag", max(0.0, loop.time() - start - LAG_SAMPLE_INTERVAL)
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of all callsites."""
+        return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Time calls of a method whose object has a ``profiler`` attribute."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+                profiler: HotPathProfiler = self.profiler
+                if not profiler.enabled:
+                    return await func(self, *args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    profiler.record(name, time.perf_counter() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            profiler: HotPathProfiler = self.profiler
+            if not profiler.enabled:
+                return func(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+async def async_capture_profile(
+    hass: HomeAssistant, duration: float, top: int
+) -> dict[str, Any]:
+    """Profile the event loop for a while and save the result.
+
+    Uses yappi when it is installed, because it attributes time to
+    coroutines correctly; falls back to cProfile otherwise. The full
+    profile is written to the configuration directory in pstats format and
+    the slowest functions of the integration and python-aidot are returned.
+    """
+    path = hass.config.path(f"{DOMAIN}_profile_{int(time.time())}.prof")
+    try:
+        import yappi  # noqa: PLC0415
+    except ImportError:
+        import cProfile  # noqa: PLC0415
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.disable()
+        await hass.async_add_executor_job(profiler.dump_stats, path)
+        backend = "cProfile"
+    else:
+        yappi.set_clock_type("wall")
+        yappi.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            yappi.stop()
+        stats = yappi.get_func_stats()
+        await hass.async_add_executor_job(stats.save, path, "pstat")
+        yappi.clear_stats()
+        backend = "yappi"
+
+    functions = await hass.async_add_executor_job(_summarize_profile, path, top)
+    _LOGGER.info("Saved %.0fs %s profile to %s", duration, backend, path)
+    return {"path": path, "backend": backend, "functions": functions}
+
+
+def _summarize_profile(path: str, top: int) -> list[dict[str, Any]]:
+    """Return the integration's functions with the most cumulative time."""
+    stats = pstats.Stats(path)
+    rows = [
+        {
+            "function": f"{filename}:{line}({func})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, func), (_, calls, total, cumulative, _) in (
+            stats.stats.items()  # type: ignore[attr-defined]
+        )
+        if f"{DOMAIN}/" in filename.replace("\\", "/")
+    ]
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
@@ -0,0 +1,104 @@
+"""Entity and device registry reconciliation for Aidot.
+
+The light and sensor platforms register a factory for the entities of one
+device. Whenever the device list changes, the reconciler computes the added
+and removed device IDs once and applies them to all platforms together: new
+entities are added in one batch per platform and devices that left the
+account are removed from the registries in a single pass.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import AidotConfigEntry, AidotDeviceUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+type EntityFactory = Callable[[AidotDeviceUpdateCoordinator], Iterable[Entity]]
+
+
+@dataclass(slots=True)
+class _PlatformEntities:
+    """Entity factory of a platform."""
+
+    factory: EntityFactory
+    async_add_entities: AddConfigEntryEntitiesCallback
+
+
+class EntityReconciler:
+    """Keep entities and registry devices in sync with the device list."""
+
+    def __init__(self, hass: HomeAssistant, entry: AidotConfigEntry) -> None:
+        """Initialize the reconciler."""
+        self.hass = hass
+        self.entry = entry
+        self._platforms: dict[Platform, _PlatformEntities] = {}
+        # Device IDs whose entities have been added
+        self._added: set[str] = set()
+        self._registry_checked = False
+
+    @callback
+    def async_add_platform(
+        self,
+        platform: Platform,
+        factory: EntityFactory,
+        async_add_entities: AddConfigEntryEntitiesCallback,
+    ) -> None:
+        """Register the entity factory of a platform."""
+        self._platforms[platform] = _PlatformEntities(factory, async_add_entities)
+
+    @callback
+    def async_reconcile(self) -> None:
+        """Add entities for new devices and remove devices that are gone."""
+        coordinators = self.entry.runtime_data.device_coordinators
+        current = coordinators.keys()
+        added = current - self._added
+        removed = self._added - current
+        if added:
+            for platform in self._platforms.values():
+                platform.async_add_entities(
+                    [
+                        entity
+                        for dev_id in added
+                        for entity in platform.factory(coordinators[dev_id])
+                    ]
+                )
+        self._added = set(current)
+
+        # The first pass also removes devices deleted while HA was stopped
+        if removed or not self._registry_checked:
+            self._registry_checked = True
+            self._async_remove_devices(current)
+
+    @callback
+    def _async_remove_devices(self, current: Iterable[str]) -> None:
+        """Remove this entry from registry devices that are not current."""
+        current_identifiers = {(DOMAIN, dev_id) for dev_id in current}
+        device_registry = dr.async_get(self.hass)
+        entity_registry = er.async_get(self.hass)
+        entry_id = self.entry.entry_id
+        for device in dr.async_entries_for_config_entry(device_registry, entry_id):
+            if not device.identifiers.isdisjoint(current_identifiers):
+                continue
+            _LOGGER.debug("Removing obsolete device entry %s", device.name)
+            for entity in er.async_entries_for_device(
+                entity_registry, device.id, include_disabled_entities=True
+            ):
+                if entity.config_entry_id == entry_id:
+                    entity_registry.async_remove(entity.entity_id)
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry_id
+            )
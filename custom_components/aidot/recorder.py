@@ -0,0 +1,126 @@
+"""Traffic recorder for Aidot devices.
+
+When enabled, discovery replies, status frames, commands and connection
+events are appended to a JSONL log in the configuration directory, one
+compact array per line: [seconds since start, kind, device ID, data]. The
+first line of every file is a header object. Lines are buffered and
+written from the executor in batches; files are rotated by size. Logs can
+be fed back into a coordinator with the replay driver in tests/replay.py.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.redact import async_redact_data
+from homeassistant.util import dt as dt_util
+
+from aidot.const import CONF_AES_KEY, CONF_MAC, CONF_NAME, CONF_PASSWORD
+
+from .const import (
+    DOMAIN,
+    RECORD_BACKUP_COUNT,
+    RECORD_FLUSH_INTERVAL,
+    RECORD_MAX_BYTES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD_VERSION = 1
+
+# Event kinds
+EVENT_DEVICES = "devices"
+EVENT_DISCOVERY = "discovery"
+EVENT_STATUS = "status"
+EVENT_COMMAND = "command"
+EVENT_CONNECT = "connect"
+EVENT_DISCONNECT = "disconnect"
+
+# Device fields kept out of logs meant for sharing
+TO_REDACT = {CONF_AES_KEY, CONF_PASSWORD, CONF_MAC, CONF_NAME}
+
+
+@callback
+def redact_devices(devices: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return a device list without the devices' credentials and identity."""
+    return async_redact_data(devices, TO_REDACT)
+
+
+class TrafficRecorder:
+    """Append device traffic to a rotating JSONL log."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = Path(hass.config.path(f"{DOMAIN}_traffic", f"{entry_id}.jsonl"))
+        self._start = time.monotonic()
+        self._header = json.dumps(
+            {
+                "version": RECORD_VERSION,
+                "entry_id": entry_id,
+                "started": dt_util.utcnow().isoformat(),
+            }
+        )
+        self._buffer: list[str] = []
+        self._unsub: CALLBACK_TYPE | None = None
+        self.events = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start writing buffered events periodically."""
+        self._unsub = async_track_time_interval(
+            self.hass, self._async_flush, timedelta(seconds=RECORD_FLUSH_INTERVAL)
+        )
+        _LOGGER.info("Recording device traffic to %s", self.path)
+
+    async def async_stop(self) -> None:
+        """Stop recording and write the remaining events."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self._async_flush()
+
+    @callback
+    def record(self, kind: str, dev_id: str | None, data: Any = None) -> None:
+        """Buffer an event."""
+        self.events += 1
+        self._buffer.append(
+            json.dumps(
+                [round(time.monotonic() - self._start, 3), kind, dev_id, data],
+                separators=(",", ":"),
+            )
+        )
+
+    async def _async_flush(self, _now: datetime | None = None) -> None:
+        """Write buffered events from the executor."""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await self.hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        """Append lines to the log, rotating it when it is full."""
+        self.path.parent.mkdir(exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= RECORD_MAX_BYTES:
+            self._rotate()
+        new_file = not self.path.exists()
+        with self.path.open("a", encoding="utf-8") as log:
+            if new_file:
+                log.write(self._header + "\n")
+            log.write("\n".join(lines) + "\n")
+
+    def _rotate(self) -> None:
+        """Shift log.N to log.N+1 and start a new log."""
+        for index in range(RECORD_BACKUP_COUNT - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
@@ -0,0 +1,157 @@
+"""Fast scene snapshots for Aidot lights.
+
+A snapshot keeps the compact state of every captured light. Restoring it
+computes, per light, the attributes that differ from its current state and
+sends all of them concurrently through the device command queues; lights
+that already match are skipped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from aidot.const import CONF_CCT, CONF_DIMMING, CONF_ON_OFF, CONF_RGBW
+from aidot.device_client import DeviceStatusData
+
+from .command_queue import CommandLane
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import AidotDeviceUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class LightState:
+    """State of a light in device units."""
+
+    on: bool
+    dimming: int | None  # percent
+    cct: int | None
+    rgbw: int | None
+
+    @classmethod
+    def from_status(cls, status: DeviceStatusData) -> LightState:
+        """Return the state of a device status."""
+        return cls(
+            status.on,
+            # DeviceStatusData scales brightness to 0-255
+            None if status.dimming is None else round(status.dimming * 100 / 255),
+            status.cct,
+            status.rgdb,
+        )
+
+    def diff(self, current: LightState) -> dict[str, Any]:
+        """Return the attributes that turn the current state into this one."""
+        if not self.on:
+            return {CONF_ON_OFF: 0} if current.on else {}
+        attrs: dict[str, Any] = {}
+        if not current.on:
+            attrs[CONF_ON_OFF] = 1
+        for key, value, current_value in (
+            (CONF_DIMMING, self.dimming, current.dimming),
+            (CONF_CCT, self.cct, current.cct),
+            (CONF_RGBW, self.rgbw, current.rgbw),
+        ):
+            if value is not None and value != current_value:
+                attrs[key] = value
+        return attrs
+
+
+class SceneSnapshots:
+    """Named light state snapshots, optionally persisted."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshots."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.snapshots"
+        )
+        self._snapshots: dict[str, dict[str, LightState]] = {}
+        self._loaded = False
+
+    async def _async_load(self) -> None:
+        """Load persisted snapshots once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if (data := await self._store.async_load()) is None:
+            return
+        for name, states in data["snapshots"].items():
+            self._snapshots.setdefault(
+                name,
+                {dev_id: LightState(*state) for dev_id, state in states.items()},
+            )
+
+    async def async_snapshot(
+        self,
+        name: str,
+        coordinators: dict[str, AidotDeviceUpdateCoordinator],
+        persist: bool,
+    ) -> int:
+        """Capture the state of all connected lights.
+
+        Returns the number of captured lights.
+        """
+        await self._async_load()
+        self._snapshots[name] = {
+            dev_id: LightState.from_status(coordinator.device_client.status)
+            for dev_id, coordinator in coordinators.items()
+            if coordinator.is_connected
+        }
+        if persist:
+            await self._store.async_save(
+                {
+                    "snapshots": {
+                        snapshot_name: {
+                            dev_id: [state.on, state.dimming, state.cct, state.rgbw]
+                            for dev_id, state in states.items()
+                        }
+                        for snapshot_name, states in self._snapshots.items()
+                    }
+                }
+            )
+        return len(self._snapshots[name])
+
+    async def async_restore(
+        self,
+        name: str,
+        coordinators: dict[str, AidotDeviceUpdateCoordinator],
+    ) -> dict[str, int] | None:
+        """Restore a snapshot, returns None if it does not exist."""
+        await self._async_load()
+        if (snapshot := self._snapshots.get(name)) is None:
+            return None
+
+        sends = []
+        matched = unavailable = 0
+        for dev_id, state in snapshot.items():
+            if (coordinator := coordinators.get(dev_id)) is None:
+                continue
+            if not coordinator.available:
+                unavailable += 1
+                continue
+            current = LightState.from_status(coordinator.device_client.status)
+            if not (attrs := state.diff(current)):
+                matched += 1
+                continue
+            sends.append(coordinator.async_send_dev_attr(attrs, CommandLane.AUTOMATION))
+
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            _LOGGER.warning("Failed to restore %d light(s) of %s", failed, name)
+        return {
+            "restored": len(results) - failed,
+            "unchanged": matched,
+            "unavailable": unavailable,
+            "failed": failed,
+        }
@@ -1,8 +1,8 @@
 """Support for Aidot diagnostic sensors."""
 
 from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import entity_registry as er
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
@@ -19,46 +19,14 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Aidot diagnostic sensors."""
-    coordinator = entry.runtime_data
-    lists_added: set[str] = set()
-
-    @callback
-    def add_entities() -> None:
-        """Add sensor entities."""
-        nonlocal lists_added
-        new_lists = {
-            device_coordinator.device_client.device_id
-            for device_coordinator in coordinator.device_coordinators.values()
-        }
-
-        if new_lists - lists_added:
-            entities = []
-            for device_id in new_lists:
-                device_coordinator = coordinator.device_coordinators[device_id]
-                entities.extend(
-                    [
-                        AidotIPAddressSensor(device_coordinator),
-                        AidotConnectionStatusSensor(device_coordinator),
-                    ]
-                )
-            async_add_entities(entities)
-            lists_added |= new_lists
-        elif lists_added - new_lists:
-            # Remove entities for devices that no longer exist
-            removed_device_ids = lists_added - new_lists
-            entity_registry = er.async_get(hass)
-            for device_id in removed_device_ids:
-                # Remove both sensor types for this device
-                for sensor_type in ["ip_address", "connection_status"]:
-                    entity_id = entity_registry.async_get_entity_id(
-                        "sensor", DOMAIN, f"{device_id}_{sensor_type}"
-                    )
-                    if entity_id:
-                        entity_registry.async_remove(entity_id)
-            lists_added -= removed_device_ids
-
-    coordinator.async_add_listener(add_entities)
-    add_entities()
+    entry.runtime_data.reconciler.async_add_platform(
+        Platform.SENSOR,
+        lambda device_coordinator: [
+            AidotIPAddressSensor(device_coordinator),
+            AidotConnectionStatusSensor(device_coordinator),
+        ],
+        async_add_entities,
+    )
 
 
 class AidotDiagnosticSensor(
@@ -135,6 +103,8 @@ class AidotConnectionStatusSensor(AidotDiagnosticSensor):
             return "Connected"
         elif wrapper.is_connecting:
             return "Connecting"
+        elif self.coordinator.available:
+            return "Idle"
         else:
             return "Disconnected"
 
@@ -146,5 +116,7 @@ class AidotConnectionStatusSensor(AidotDiagnosticSensor):
             return "mdi:lan-connect"
         elif wrapper.is_connecting:
             return "mdi:lan-pending"
+        elif self.coordinator.available:
+            return "mdi:lan"
         else:
             return "mdi:lan-disconnect"
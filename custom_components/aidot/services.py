@@ -0,0 +1,237 @@
+"""Services for the Aidot integration."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.importlib import async_import_module
+
+from .const import (
+    DOMAIN,
+    PROFILE_DEFAULT_DURATION,
+    PROFILE_TOP_FUNCTIONS,
+    SERVICE_CIRCADIAN_ENROLL,
+    SERVICE_CIRCADIAN_UNENROLL,
+    SERVICE_PROFILE,
+    SERVICE_RESTORE,
+    SERVICE_SNAPSHOT,
+)
+from .profiling import async_capture_profile
+
+if TYPE_CHECKING:
+    from .coordinator import AidotConfigEntry, AidotDeviceUpdateCoordinator
+    from .discovery import AidotDiscoveryHub
+    from .scenes import SceneSnapshots
+
+ATTR_DURATION = "duration"
+ATTR_TOP = "top"
+ATTR_PERSIST = "persist"
+ATTR_BRIGHTNESS = "brightness"
+
+DEFAULT_SNAPSHOT_NAME = "default"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=PROFILE_DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_TOP, default=PROFILE_TOP_FUNCTIONS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+    }
+)
+
+SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_NAME, default=DEFAULT_SNAPSHOT_NAME): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_PERSIST, default=False): bool,
+    }
+)
+
+RESTORE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_NAME, default=DEFAULT_SNAPSHOT_NAME): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+CIRCADIAN_ENROLL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_BRIGHTNESS, default=True): bool,
+    }
+)
+
+CIRCADIAN_UNENROLL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+
+def _loaded_entries(hass: HomeAssistant) -> list[AidotConfigEntry]:
+    """Return all loaded Aidot config entries."""
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+def _device_coordinators(
+    hass: HomeAssistant, entity_ids: list[str] | None
+) -> dict[str, AidotDeviceUpdateCoordinator]:
+    """Return the device coordinators of the given lights, or of all lights."""
+    coordinators = {
+        dev_id: coordinator
+        for entry in _loaded_entries(hass)
+        for dev_id, coordinator in entry.runtime_data.device_coordinators.items()
+    }
+    if entity_ids is None:
+        return coordinators
+    entity_registry = er.async_get(hass)
+    selected = {}
+    for entity_id in entity_ids:
+        entity = entity_registry.async_get(entity_id)
+        if (
+            entity is None
+            or entity.platform != DOMAIN
+            or entity.domain != Platform.LIGHT
+            or entity.unique_id not in coordinators
+        ):
+            raise ServiceValidationError(f"{entity_id} is not an AiDot light")
+        selected[entity.unique_id] = coordinators[entity.unique_id]
+    return selected
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Aidot services."""
+    profile_lock = asyncio.Lock()
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the event loop and return the integration's hot paths."""
+        if profile_lock.locked():
+            raise HomeAssistantError("A profile is already being captured")
+        async with profile_lock:
+            result = await async_capture_profile(
+                hass, call.data[ATTR_DURATION], call.data[ATTR_TOP]
+            )
+        result["timings"] = {
+            entry.title: entry.runtime_data.profiler.as_dict()
+            for entry in _loaded_entries(hass)
+        }
+        hub: AidotDiscoveryHub | None = hass.data.get(DOMAIN)
+        if hub is not None:
+            result["discovery_offload"] = hub.offloader.as_dict()
+            if hub.crypto is not None:
+                result["crypto"] = hub.crypto.as_dict()
+        return result
+
+    # Services are registered at startup, their helpers are only imported
+    # and built when first called
+    snapshots: SceneSnapshots | None = None
+
+    async def async_get_snapshots() -> SceneSnapshots:
+        """Return the snapshot store, creating it on first use."""
+        nonlocal snapshots
+        if snapshots is None:
+            scenes = await async_import_module(hass, f"{__package__}.scenes")
+            # Another call may have created it while the module was imported
+            if snapshots is None:
+                snapshots = scenes.SceneSnapshots(hass)
+        return snapshots
+
+    async def async_snapshot(call: ServiceCall) -> ServiceResponse:
+        """Capture the state of AiDot lights."""
+        store = await async_get_snapshots()
+        captured = await store.async_snapshot(
+            call.data[ATTR_NAME],
+            _device_coordinators(hass, call.data.get(ATTR_ENTITY_ID)),
+            call.data[ATTR_PERSIST],
+        )
+        return {"captured": captured}
+
+    async def async_restore(call: ServiceCall) -> ServiceResponse:
+        """Restore a snapshot, sending only what changed."""
+        store = await async_get_snapshots()
+        result = await store.async_restore(
+            call.data[ATTR_NAME],
+            _device_coordinators(hass, call.data.get(ATTR_ENTITY_ID)),
+        )
+        if result is None:
+            raise ServiceValidationError(f"No snapshot named {call.data[ATTR_NAME]}")
+        return result
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SNAPSHOT,
+        async_snapshot,
+        schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE,
+        async_restore,
+        schema=RESTORE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    def _by_entry(entity_ids: list[str]) -> dict[AidotConfigEntry, list[str]]:
+        """Group the device IDs of the given lights by config entry."""
+        grouped: dict[AidotConfigEntry, list[str]] = {}
+        for dev_id, coordinator in _device_coordinators(hass, entity_ids).items():
+            grouped.setdefault(coordinator.config_entry, []).append(dev_id)
+        return grouped
+
+    async def async_circadian_enroll(call: ServiceCall) -> None:
+        """Let AiDot lights follow the circadian curve."""
+        await asyncio.gather(
+            *(
+                entry.runtime_data.circadian.async_enroll(
+                    dev_ids, call.data[ATTR_BRIGHTNESS]
+                )
+                for entry, dev_ids in _by_entry(call.data[ATTR_ENTITY_ID]).items()
+            )
+        )
+
+    async def async_circadian_unenroll(call: ServiceCall) -> None:
+        """Stop adjusting AiDot lights to the circadian curve."""
+        for entry, dev_ids in _by_entry(call.data[ATTR_ENTITY_ID]).items():
+            entry.runtime_data.circadian.async_unenroll(dev_ids)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CIRCADIAN_ENROLL,
+        async_circadian_enroll,
+        schema=CIRCADIAN_ENROLL_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CIRCADIAN_UNENROLL,
+        async_circadian_unenroll,
+        schema=CIRCADIAN_UNENROLL_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,161 @@
+"""On-demand device sessions for Aidot devices.
+
+In lazy connection mode a device session is only opened when a command or
+refresh needs it and is closed again after an idle period. The number of
+open sessions is capped; when the cap is reached the least recently used
+idle session is closed first, so socket and memory use scale with the
+number of active devices rather than installed ones.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import SESSION_SWEEP_MIN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Track open device sessions, close idle ones and enforce an LRU cap."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        idle_timeout: float,
+        max_sessions: int,
+        open_session: Callable[[str], Awaitable[bool]],
+        close_session: Callable[[str], Awaitable[None]],
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            hass: Home Assistant instance
+            idle_timeout: Seconds without use after which a session is closed
+            max_sessions: Maximum number of open sessions, 0 for no limit
+            open_session: Opens the session of a device, returns success
+            close_session: Closes the session of a device
+        """
+        self.hass = hass
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._open_session = open_session
+        self._close_session = close_session
+        # Device ID -> last use, least recently used first
+        self._sessions: OrderedDict[str, float] = OrderedDict()
+        self._busy: dict[str, int] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        self.opened = 0
+        self.evicted = 0
+        self.idle_closed = 0
+
+    @property
+    def open_count(self) -> int:
+        """Return the number of open sessions."""
+        return len(self._sessions)
+
+    @callback
+    def async_start(self) -> None:
+        """Start closing idle sessions periodically."""
+        interval = max(SESSION_SWEEP_MIN_INTERVAL, self.idle_timeout / 4)
+        self._unsub = async_track_time_interval(
+            self.hass, self._async_sweep, timedelta(seconds=interval)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop closing idle sessions."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._sessions.clear()
+        self._busy.clear()
+
+    @callback
+    def async_touch(self, dev_id: str) -> None:
+        """Mark a session as used, e.g. when the device pushes status."""
+        if dev_id in self._sessions:
+            self._sessions[dev_id] = time.monotonic()
+            self._sessions.move_to_end(dev_id)
+
+    @callback
+    def async_forget(self, dev_id: str) -> None:
+        """Stop tracking a session that was closed elsewhere."""
+        self._sessions.pop(dev_id, None)
+
+    async def async_acquire(self, dev_id: str) -> bool:
+        """Open the session of a device if needed and mark it busy.
+
+        Returns True if the session is open. Every successful acquire must
+        be followed by async_release(); a failed or interrupted acquire
+        releases the device itself.
+        """
+        self._busy[dev_id] = self._busy.get(dev_id, 0) + 1
+        if dev_id not in self._sessions:
+            try:
+                await self._async_make_room()
+                opened = await self._open_session(dev_id)
+            except BaseException:
+                self.async_release(dev_id)
+                raise
+            if not opened:
+                self.async_release(dev_id)
+                return False
+            self.opened += 1
+        self._sessions[dev_id] = time.monotonic()
+        self._sessions.move_to_end(dev_id)
+        return True
+
+    @callback
+    def async_release(self, dev_id: str) -> None:
+        """Mark a session as no longer busy."""
+        if (count := self._busy.get(dev_id, 0) - 1) > 0:
+            self._busy[dev_id] = count
+        else:
+            self._busy.pop(dev_id, None)
+        self.async_touch(dev_id)
+
+    async def _async_make_room(self) -> None:
+        """Close least recently used idle sessions to stay under the cap."""
+        if not self.max_sessions:
+            return
+        while len(self._sessions) >= self.max_sessions:
+            victim = next(
+                (dev_id for dev_id in self._sessions if dev_id not in self._busy),
+                None,
+            )
+            if victim is None:
+                # Every open session is in use, temporarily exceed the cap
+                return
+            _LOGGER.debug("Closing least recently used session %s", victim)
+            del self._sessions[victim]
+            self.evicted += 1
+            await self._close_session(victim)
+
+    async def _async_sweep(self, _now: datetime) -> None:
+        """Close sessions that have been idle for too long."""
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [
+            dev_id
+            for dev_id, last_used in self._sessions.items()
+            if last_used < deadline and dev_id not in self._busy
+        ]
+        closed = 0
+        for dev_id in idle:
+            # Sessions can be used, refreshed or forgotten while one closes
+            last_used = self._sessions.get(dev_id)
+            if last_used is None or last_used >= deadline or dev_id in self._busy:
+                continue
+            self._sessions.pop(dev_id, None)
+            self.idle_closed += 1
+            closed += 1
+            await self._close_session(dev_id)
+        if closed:
+            _LOGGER.debug("Closed %d idle device session(s)", closed)
@@ -0,0 +1,186 @@
+"""Admission control per network segment for Aidot devices.
+
+Overload is local: many bulbs behind one access point logging in or
+receiving a scene together lose packets there while other access points
+sit idle. With grouping enabled, devices are grouped by subnet or by the
+area assigned to them in the device registry. Each group has its own
+concurrency limit and token bucket for logins and device commands, and
+keeps its own latency and loss statistics, so one crowded group no longer
+slows down the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import StrEnum
+import ipaddress
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .admission import TokenBucket
+from .const import (
+    ADMISSION_GROUP_BURST,
+    ADMISSION_GROUP_CONCURRENCY,
+    ADMISSION_GROUP_RATE,
+    ADMISSION_SUBNET_PREFIX,
+    DOMAIN,
+)
+from .profiling import CallsiteStats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Operations admitted per group
+OPERATION_LOGIN = "login"
+OPERATION_COMMAND = "command"
+OPERATION_STATUS = "status"
+
+# Groups of devices without an IP address or area
+GROUP_UNKNOWN = "unknown"
+
+
+class AdmissionGrouping(StrEnum):
+    """How devices are grouped for admission control."""
+
+    NONE = "none"
+    SUBNET = "subnet"
+    AREA = "area"
+
+
+@dataclass(slots=True)
+class OperationStats:
+    """Latency and loss of one kind of operation in a group."""
+
+    latency: CallsiteStats = field(default_factory=CallsiteStats)
+    attempts: int = 0
+    failures: int = 0
+
+
+@dataclass(slots=True)
+class Admission:
+    """An admitted operation, mark it failed to count it as lost."""
+
+    failed: bool = False
+
+
+class AdmissionGroup:
+    """Concurrency limit, rate limit and statistics of one device group."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the group."""
+        self.name = name
+        self._semaphore = asyncio.Semaphore(ADMISSION_GROUP_CONCURRENCY)
+        self._bucket = TokenBucket(ADMISSION_GROUP_RATE, ADMISSION_GROUP_BURST)
+        self.in_flight = 0
+        # Time operations waited for admission
+        self.wait = CallsiteStats()
+        self.operations: dict[str, OperationStats] = {}
+
+    @asynccontextmanager
+    async def async_admit(self, operation: str) -> AsyncIterator[Admission]:
+        """Wait for a slot and a token, then time the operation."""
+        start = time.perf_counter()
+        await self._bucket.async_acquire()
+        async with self._semaphore:
+            admitted = time.perf_counter()
+            self.wait.record(admitted - start)
+            stats = self.operations.setdefault(operation, OperationStats())
+            stats.attempts += 1
+            admission = Admission()
+            self.in_flight += 1
+            try:
+                yield admission
+            except Exception:
+                admission.failed = True
+                raise
+            finally:
+                self.in_flight -= 1
+                stats.latency.record(time.perf_counter() - admitted)
+                if admission.failed:
+                    stats.failures += 1
+
+
+class TopologyAdmission:
+    """Admission groups of a config entry's devices."""
+
+    def __init__(self, hass: HomeAssistant, grouping: AdmissionGrouping) -> None:
+        """Initialize admission control.
+
+        Args:
+            hass: Home Assistant instance
+            grouping: How devices are grouped, NONE admits everything at once
+        """
+        self.hass = hass
+        self.grouping = grouping
+        self.groups: dict[str, AdmissionGroup] = {}
+        # Device ID -> area ID, cleared when the device registry changes
+        self._areas: dict[str, str] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Follow area changes in the device registry."""
+        if self.grouping is AdmissionGrouping.AREA:
+            self._unsub = self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._handle_registry_update
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the device registry."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _handle_registry_update(
+        self, event: Event[dr.EventDeviceRegistryUpdatedData]
+    ) -> None:
+        """Forget the cached areas after a device registry change."""
+        self._areas.clear()
+
+    def _group_name(self, dev_id: str, ip_address: str | None) -> str:
+        """Return the name of the group a device belongs to."""
+        if self.grouping is AdmissionGrouping.SUBNET:
+            if ip_address is None:
+                return GROUP_UNKNOWN
+            return str(
+                ipaddress.ip_network(
+                    f"{ip_address}/{ADMISSION_SUBNET_PREFIX}", strict=False
+                )
+            )
+        if (area := self._areas.get(dev_id)) is None:
+            device = dr.async_get(self.hass).async_get_device(
+                identifiers={(DOMAIN, dev_id)}
+            )
+            area = GROUP_UNKNOWN
+            if device is not None and device.area_id:
+                area = device.area_id
+            self._areas[dev_id] = area
+        return area
+
+    @asynccontextmanager
+    async def async_admit(
+        self, dev_id: str, ip_address: str | None, operation: str
+    ) -> AsyncIterator[Admission]:
+        """Admit an operation on a device through its group.
+
+        Args:
+            dev_id: The device ID
+            ip_address: The device's IP address, if known
+            operation: One of the OPERATION_* kinds, for statistics
+        """
+        if self.grouping is AdmissionGrouping.NONE:
+            yield Admission()
+            return
+        name = self._group_name(dev_id, ip_address)
+        if (group := self.groups.get(name)) is None:
+            _LOGGER.debug("New admission group %s", name)
+            group = self.groups[name] = AdmissionGroup(name)
+        async with group.async_admit(operation) as admission:
+            yield admission
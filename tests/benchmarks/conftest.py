@@ -0,0 +1,136 @@
+"""Baseline comparison for the AiDot benchmarks.
+
+Every benchmark reports the fastest of BENCHMARK_ROUNDS rounds through the
+``benchmark`` fixture, which fails the test when that time grew by more
+than the threshold against baseline.json. Timings only compare on the
+same kind of quiet machine, so the benchmarks are skipped unless asked
+for, and the baseline is regenerated on that machine::
+
+    pytest tests/benchmarks --benchmark-save
+    pytest tests/benchmarks --benchmark --benchmark-threshold 25
+
+Benchmarks missing from the baseline are recorded but never fail. The
+options are registered in the conftest of the tests package.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Generator
+import gc
+from inspect import isawaitable
+import json
+from pathlib import Path
+import platform
+import time
+import timeit
+from typing import Any
+
+import pytest
+
+BENCHMARKS = Path(__file__).parent
+BASELINE = BENCHMARKS / "baseline.json"
+BENCHMARK_ROUNDS = 7  # rounds per benchmark, the fastest one is reported
+
+_results: dict[str, float] = {}
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip the benchmarks unless they were asked for."""
+    if config.getoption("--benchmark") or config.getoption("--benchmark-save"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark")
+    for item in items:
+        if item.path.is_relative_to(BENCHMARKS):
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Write the baseline if asked to."""
+    if not session.config.getoption("--benchmark-save") or not _results:
+        return
+    baseline = _load_baseline()
+    baseline["python"] = platform.python_version()
+    baseline["benchmarks"] = dict(
+        sorted({**baseline.get("benchmarks", {}), **_results}.items())
+    )
+    BASELINE.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def _load_baseline() -> dict[str, Any]:
+    """Return the stored baseline."""
+    if not BASELINE.exists():
+        return {}
+    return json.loads(BASELINE.read_text(encoding="utf-8"))
+
+
+class Benchmark:
+    """Time a benchmark and compare it with the baseline."""
+
+    def __init__(self, baseline: dict[str, float], threshold: float) -> None:
+        """Initialize the benchmark."""
+        self._baseline = baseline
+        self._threshold = threshold
+
+    async def async_run(
+        self,
+        name: str,
+        target: Callable[[], Awaitable[Any] | Any],
+        setup: Callable[[], Awaitable[Any] | Any] | None = None,
+    ) -> float:
+        """Time target over BENCHMARK_ROUNDS rounds and check the fastest.
+
+        Args:
+            name: Key of the benchmark in the baseline
+            target: Called once per round, awaited if it returns an awaitable
+            setup: Called before each round, outside of the timing
+
+        Returns the fastest round in seconds.
+        """
+        best = float("inf")
+        for _ in range(BENCHMARK_ROUNDS):
+            if setup is not None and isawaitable(pending := setup()):
+                await pending
+            # Collections are left out of the timing, as timeit does
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                if isawaitable(pending := target()):
+                    await pending
+                best = min(best, time.perf_counter() - start)
+            finally:
+                gc.enable()
+        self.check(name, best)
+        return best
+
+    def run_calls(self, name: str, target: Callable[[], Any], number: int) -> float:
+        """Time a synchronous function per call and check the fastest round.
+
+        Returns the fastest time per call in seconds.
+        """
+        best = min(timeit.repeat(target, number=number, repeat=BENCHMARK_ROUNDS))
+        self.check(name, best / number)
+        return best / number
+
+    def check(self, name: str, seconds: float) -> None:
+        """Record a result and fail if it regressed against the baseline."""
+        time_us = _results[name] = round(seconds * 1_000_000, 3)
+        if (previous := self._baseline.get(name)) is None:
+            return
+        change = (time_us / previous - 1) * 100
+        assert change <= self._threshold, (
+            f"{name} took {time_us:.1f}µs, {change:.0f}% slower than the "
+            f"baseline of {previous:.1f}µs"
+        )
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Generator[Benchmark]:
+    """Return the benchmark runner."""
+    baseline = (
+        {}
+        if request.config.getoption("--benchmark-save")
+        else _load_baseline().get("benchmarks", {})
+    )
+    yield Benchmark(baseline, request.config.getoption("--benchmark-threshold"))
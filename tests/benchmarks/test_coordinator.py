@@ -0,0 +1,194 @@
+"""Benchmarks of the device manager coordinator's hot paths at scale.
+
+The coordinator runs against the stub cloud and device clients, so only
+the integration's own work and python-aidot's status handling are timed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from aidot.const import CONF_DIMMING, CONF_LOGIN_INFO
+
+from custom_components.aidot.const import DOMAIN
+from custom_components.aidot.coordinator import AidotDeviceManagerCoordinator
+from custom_components.aidot.device_wrapper import DeviceClientWrapper
+
+from ..stubs import USER_ID, StubCloudClient, make_devices
+from .conftest import Benchmark
+
+SCALES = (10, 100, 1000, 5000)
+
+
+@pytest.fixture(params=SCALES, ids=str)
+def device_count(request: pytest.FixtureRequest) -> int:
+    """Return the number of lights in the account."""
+    return request.param
+
+
+@pytest.fixture
+async def create_coordinator(
+    hass: HomeAssistant, device_count: int
+) -> AsyncGenerator[Callable[[], AidotDeviceManagerCoordinator]]:
+    """Return a factory of coordinators for an account of stub lights."""
+    coordinators: list[AidotDeviceManagerCoordinator] = []
+
+    def create() -> AidotDeviceManagerCoordinator:
+        entry = MockConfigEntry(domain=DOMAIN, data={CONF_LOGIN_INFO: {"id": USER_ID}})
+        entry.add_to_hass(hass)
+        with patch(
+            "custom_components.aidot.coordinator.AidotClient",
+            return_value=StubCloudClient(make_devices(device_count)),
+        ):
+            coordinator = AidotDeviceManagerCoordinator(hass, entry)
+        coordinators.append(coordinator)
+        return coordinator
+
+    yield create
+    for coordinator in coordinators:
+        await coordinator.async_unload()
+
+
+@pytest.fixture
+async def coordinator(
+    create_coordinator: Callable[[], AidotDeviceManagerCoordinator],
+) -> AidotDeviceManagerCoordinator:
+    """Return a coordinator with a device coordinator per light."""
+    coordinator = create_coordinator()
+    await coordinator._async_update_data()
+    return coordinator
+
+
+async def _async_connect_all(coordinator: AidotDeviceManagerCoordinator) -> None:
+    """Give every light an IP address and log in to all of them."""
+    devices = list(coordinator.device_coordinators.values())
+    for index, device in enumerate(devices):
+        DeviceClientWrapper(device.device_client).set_ip_address(
+            f"10.0.{index // 250}.{index % 250 + 1}"
+        )
+    results = await asyncio.gather(
+        *(device.async_connect_and_wait_for_status() for device in devices)
+    )
+    assert all(results)
+
+
+async def test_device_list_create(
+    benchmark: Benchmark,
+    create_coordinator: Callable[[], AidotDeviceManagerCoordinator],
+    device_count: int,
+) -> None:
+    """Create the device coordinators of a freshly fetched device list."""
+    coordinators: list[AidotDeviceManagerCoordinator] = []
+
+    def setup() -> None:
+        coordinators.append(create_coordinator())
+
+    await benchmark.async_run(
+        f"device_list_create[{device_count}]",
+        lambda: coordinators[-1]._async_update_data(),
+        setup,
+    )
+    assert len(coordinators[-1].device_coordinators) == device_count
+
+
+async def test_device_list_refresh(
+    benchmark: Benchmark,
+    coordinator: AidotDeviceManagerCoordinator,
+    device_count: int,
+) -> None:
+    """Refresh an unchanged device list."""
+    await benchmark.async_run(
+        f"device_list_refresh[{device_count}]", coordinator._async_update_data
+    )
+
+
+async def test_discovery_callback(
+    benchmark: Benchmark,
+    coordinator: AidotDeviceManagerCoordinator,
+    device_count: int,
+) -> None:
+    """Handle a batch of discovery replies moving every light to a new IP."""
+    await _async_connect_all(coordinator)
+    batches: list[dict[str, str]] = []
+
+    def setup() -> None:
+        subnet = len(batches) % 2 + 1
+        batches.append(
+            {
+                dev_id: f"10.{subnet}.{index // 250}.{index % 250 + 1}"
+                for index, dev_id in enumerate(coordinator.device_coordinators)
+            }
+        )
+
+    await benchmark.async_run(
+        f"discovery_callback[{device_count}]",
+        lambda: coordinator._handle_discovery(batches[-1]),
+        setup,
+    )
+    assert coordinator.ip_changes == len(batches) * device_count
+
+
+async def test_status_fanout(
+    benchmark: Benchmark,
+    coordinator: AidotDeviceManagerCoordinator,
+    device_count: int,
+) -> None:
+    """Deliver a status frame from every light to its entity."""
+    await _async_connect_all(coordinator)
+    devices = list(coordinator.device_coordinators.values())
+    updates = 0
+
+    def listener() -> None:
+        nonlocal updates
+        updates += 1
+
+    for device in devices:
+        device.async_add_listener(listener)
+
+    def push() -> None:
+        for device in devices:
+            device.device_client.push_status({CONF_DIMMING: 50})
+
+    await benchmark.async_run(f"status_fanout[{device_count}]", push)
+    assert updates >= device_count
+
+
+async def test_connect_and_wait(
+    benchmark: Benchmark,
+    coordinator: AidotDeviceManagerCoordinator,
+    device_count: int,
+) -> None:
+    """Log in to every light and wait for its first status."""
+    await _async_connect_all(coordinator)
+    devices = list(coordinator.device_coordinators.values())
+
+    async def disconnect() -> None:
+        for device in devices:
+            await device.device_client.reset()
+
+    await benchmark.async_run(
+        f"connect_and_wait[{device_count}]",
+        lambda: _async_connect_all(coordinator),
+        disconnect,
+    )
+
+
+async def test_reconnect_check(
+    benchmark: Benchmark,
+    coordinator: AidotDeviceManagerCoordinator,
+    device_count: int,
+) -> None:
+    """Run the periodic reconnect check with every light connected."""
+    await _async_connect_all(coordinator)
+
+    await benchmark.async_run(
+        f"reconnect_check[{device_count}]", coordinator._check_connections
+    )
+    assert not coordinator._connection_tasks
@@ -0,0 +1,68 @@
+"""Benchmarks of per-frame and per-command work on fixed inputs."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from aidot.aes_utils import aes_decrypt, aes_encrypt
+from aidot.const import CONF_ATTR, CONF_PAYLOAD
+from aidot.device_client import DeviceStatusData
+
+from custom_components.aidot.command_queue import CommandLane, DeviceCommandQueue
+
+from .conftest import Benchmark
+
+ITERATIONS = 2000  # calls per round of the AES and parsing benchmarks
+DISPATCH_COMMANDS = 1000  # commands sent per round of the dispatch benchmark
+
+# Fixed inputs, shaped like a device's status frame and session key
+KEY = b"aidotbenchmark16"
+FRAME = json.dumps(
+    {
+        "service": "device",
+        "method": "getDevAttrResp",
+        "seq": "ha9300042",
+        CONF_PAYLOAD: {
+            "ascNumber": 42,
+            CONF_ATTR: {"OnOff": 1, "Dimming": 50, "CCT": 4000, "RGBW": -16776961},
+        },
+    }
+).encode()
+CIPHERTEXT = aes_encrypt(FRAME, KEY)
+
+
+def _parse_status() -> None:
+    """Decode a status frame like the session receive loop does."""
+    payload = json.loads(FRAME)[CONF_PAYLOAD]
+    DeviceStatusData().update(payload.get(CONF_ATTR))
+
+
+async def test_aes(benchmark: Benchmark) -> None:
+    """Encrypt and decrypt one status frame."""
+    benchmark.run_calls("aes_encrypt", lambda: aes_encrypt(FRAME, KEY), ITERATIONS)
+    benchmark.run_calls(
+        "aes_decrypt", lambda: aes_decrypt(CIPHERTEXT, KEY), ITERATIONS
+    )
+
+
+async def test_status_parse(benchmark: Benchmark) -> None:
+    """Parse one status frame into the device status."""
+    benchmark.run_calls("status_parse", _parse_status, ITERATIONS)
+
+
+async def test_command_dispatch(benchmark: Benchmark) -> None:
+    """Send commands across all lanes through a queue whose transport does nothing."""
+
+    async def send(attrs: dict[str, Any]) -> None:
+        """Discard the command."""
+
+    lanes = list(CommandLane)
+    queue = DeviceCommandQueue("benchmark", send)
+
+    async def dispatch() -> None:
+        for index in range(DISPATCH_COMMANDS):
+            await queue.async_send({"benchmark": index}, lanes[index % len(lanes)])
+
+    await benchmark.async_run(f"command_dispatch[{DISPATCH_COMMANDS}]", dispatch)
+    queue.cancel()
@@ -0,0 +1,38 @@
+"""Fixtures for AiDot tests."""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+
+import pytest
+
+DEFAULT_BENCHMARK_THRESHOLD = 25.0  # percent a benchmark may slow down
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the options of the benchmarks in tests/benchmarks."""
+    group = parser.getgroup("aidot benchmarks")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Run the benchmarks and compare them with baseline.json",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="Run the benchmarks and write their results to baseline.json",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=DEFAULT_BENCHMARK_THRESHOLD,
+        help="Percent a benchmark may slow down before it fails",
+    )
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    enable_custom_integrations: None,
+) -> Generator[None]:
+    """Load the integration from custom_components in every test."""
+    yield
@@ -0,0 +1,215 @@
+"""Replay recorded AiDot traffic into a device manager coordinator.
+
+Feeds a log written by the integration's traffic recorder into an
+AidotDeviceManagerCoordinator whose cloud and device clients are stubs,
+so the coordinator can be profiled and regression-tested on real-world
+traffic without devices or the cloud::
+
+    report = await ReplayDriver(hass, entry, path, speed=10).async_run()
+
+The entry should be a throwaway one: the coordinator is created for it
+with python-aidot's cloud client patched out, and the device list it
+receives is never written to the entry's device store, because recorded
+device lists carry redacted keys.
+
+Discovery replies, status frames, commands and disconnects are replayed
+at their recorded times divided by ``speed`` (0 replays as fast as
+possible). Device logins succeed or fail in the recorded order and take
+the recorded time. The reconnect check the discovery hub normally runs is
+called every RECONNECT_INTERVAL of recorded time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from aidot.const import CONF_CCT, CONF_DIMMING, CONF_ON_OFF, CONF_RGBW
+
+from custom_components.aidot.command_queue import CommandLane
+from custom_components.aidot.const import RECONNECT_INTERVAL
+from custom_components.aidot.coordinator import AidotDeviceManagerCoordinator
+from custom_components.aidot.recorder import (
+    EVENT_COMMAND,
+    EVENT_CONNECT,
+    EVENT_DEVICES,
+    EVENT_DISCONNECT,
+    EVENT_DISCOVERY,
+    EVENT_STATUS,
+)
+
+from .stubs import StubCloudClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Login outcome for devices without recorded connection events
+DEFAULT_LOGIN = (True, 0.05)
+
+type RecordedEvent = tuple[float, str, str | None, Any]
+
+
+def read_log(path: Path) -> list[RecordedEvent]:
+    """Read the events of a traffic log, skipping file headers."""
+    events: list[RecordedEvent] = []
+    with path.open(encoding="utf-8") as log:
+        for line in log:
+            if line.startswith("["):
+                offset, kind, dev_id, data = json.loads(line)
+                events.append((offset, kind, dev_id, data))
+    return events
+
+
+def _frame_attrs(status: list[Any]) -> dict[str, Any]:
+    """Return the frame attributes of a recorded status."""
+    _, on, dimming, cct, rgbw = status
+    attrs = {CONF_ON_OFF: int(bool(on)), CONF_CCT: cct, CONF_RGBW: rgbw}
+    if dimming is not None:
+        # Recorded on DeviceStatusData's 0-255 scale
+        attrs[CONF_DIMMING] = round(dimming * 100 / 255)
+    return {key: value for key, value in attrs.items() if value is not None}
+
+
+@dataclass(slots=True)
+class ReplayReport:
+    """Outcome of a replay."""
+
+    events: int
+    recorded_duration: float
+    wall_duration: float
+    connection_attempts: int
+    connection_failures: int
+    commands_failed: int
+    connected: int
+    devices: int
+
+
+class ReplayDriver:
+    """Feed a recorded traffic log into a device manager coordinator."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        path: Path,
+        speed: float = 1.0,
+    ) -> None:
+        """Initialize the driver.
+
+        Args:
+            hass: Home Assistant instance
+            entry: Throwaway config entry the coordinator is created for
+            path: Traffic log written by the recorder
+            speed: Replay speed factor, 0 for as fast as possible
+        """
+        self.hass = hass
+        self.entry = entry
+        self.path = path
+        self.speed = speed
+        self.client = StubCloudClient(login=self._async_login)
+        self.coordinator: AidotDeviceManagerCoordinator | None = None
+        self._logins: dict[str, deque[tuple[bool, float]]] = defaultdict(deque)
+
+    async def _async_login(self, dev_id: str) -> bool:
+        """Log in with the next recorded outcome of a device."""
+        logins = self._logins.get(dev_id)
+        success, duration = logins.popleft() if logins else DEFAULT_LOGIN
+        await self.async_sleep(duration)
+        return success
+
+    async def async_sleep(self, recorded: float) -> None:
+        """Sleep for a recorded duration at replay speed."""
+        await asyncio.sleep(recorded / self.speed if self.speed else 0)
+
+    async def async_run(self) -> ReplayReport:
+        """Replay the log, unload the coordinator and return a summary."""
+        events = await self.hass.async_add_executor_job(read_log, self.path)
+        for _, kind, dev_id, data in events:
+            if kind == EVENT_CONNECT and dev_id is not None:
+                self._logins[dev_id].append((data[0], data[1]))
+
+        with patch(
+            "custom_components.aidot.coordinator.AidotClient",
+            return_value=self.client,
+        ):
+            coordinator = AidotDeviceManagerCoordinator(self.hass, self.entry)
+        self.coordinator = coordinator
+        try:
+            # Recorded device lists carry redacted keys
+            with patch.object(coordinator.device_store, "async_save"):
+                return await self._async_replay(coordinator, events)
+        finally:
+            await coordinator.async_unload()
+
+    async def _async_replay(
+        self,
+        coordinator: AidotDeviceManagerCoordinator,
+        events: list[RecordedEvent],
+    ) -> ReplayReport:
+        """Feed the events into the coordinator."""
+        client = self.client
+        commands: list[asyncio.Task] = []
+        start = time.monotonic()
+        previous = 0.0
+        next_check = RECONNECT_INTERVAL
+
+        for offset, kind, dev_id, data in events:
+            await self.async_sleep(offset - previous)
+            previous = offset
+            while offset >= next_check:
+                coordinator._check_connections()
+                next_check += RECONNECT_INTERVAL
+
+            if kind == EVENT_DEVICES:
+                client.devices = data
+                await coordinator.async_refresh()
+            elif dev_id is None or dev_id not in coordinator.device_coordinators:
+                continue
+            elif kind == EVENT_DISCOVERY:
+                coordinator._handle_discovery({dev_id: data})
+            elif kind == EVENT_STATUS:
+                device_client = client._device_clients[dev_id]
+                status = device_client.status
+                # Through update() so the frame reaches the ack tracker, then
+                # the exact recorded values
+                status.update(_frame_attrs(data))
+                status.online, status.on, status.dimming, status.cct, status.rgdb = data
+                if device_client.connect_and_login and device_client._status_fresh_cb:
+                    device_client._status_fresh_cb(status)
+            elif kind == EVENT_COMMAND:
+                attrs, lane = data
+                commands.append(
+                    self.hass.async_create_task(
+                        coordinator.device_coordinators[dev_id].async_send_dev_attr(
+                            attrs, CommandLane(lane)
+                        )
+                    )
+                )
+            elif kind == EVENT_DISCONNECT:
+                await client._device_clients[dev_id].reset()
+
+        results = await asyncio.gather(*commands, return_exceptions=True)
+        report = ReplayReport(
+            events=len(events),
+            recorded_duration=previous,
+            wall_duration=time.monotonic() - start,
+            connection_attempts=coordinator.connection_attempts,
+            connection_failures=coordinator.connection_failures,
+            commands_failed=sum(isinstance(result, Exception) for result in results),
+            connected=sum(
+                device.is_connected
+                for device in coordinator.device_coordinators.values()
+            ),
+            devices=len(coordinator.device_coordinators),
+        )
+        _LOGGER.info("Replayed %s", report)
+        return report
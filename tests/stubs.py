@@ -0,0 +1,143 @@
+"""Stub AiDot cloud and device clients for tests and benchmarks.
+
+The stubs replace python-aidot's network I/O only: device clients are
+real DeviceClient instances whose login and sends never open a socket, so
+status handling, the status callback and the private attributes the
+integration reads behave as in production.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.const import Platform
+
+from aidot.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_AES_KEY,
+    CONF_DEVICE_LIST,
+    CONF_ID,
+    CONF_TYPE,
+)
+from aidot.device_client import DeviceClient
+
+# Decides the outcome of a device login, called with the device ID
+type LoginHandler = Callable[[str], Awaitable[bool]]
+
+USER_ID = "stub-user"
+
+
+def make_devices(count: int) -> list[dict[str, Any]]:
+    """Return a cloud device list of lights."""
+    return [
+        {
+            CONF_ID: f"light-{index:05d}",
+            CONF_TYPE: Platform.LIGHT,
+            CONF_AES_KEY: [f"key{index:013d}"],
+        }
+        for index in range(count)
+    ]
+
+
+async def _login_succeeds(dev_id: str) -> bool:
+    """Let every login succeed immediately."""
+    return True
+
+
+class StubDeviceClient(DeviceClient):
+    """Device client that logs in and sends without a TCP session."""
+
+    def __init__(
+        self,
+        device: dict[str, Any],
+        user_info: dict[str, Any],
+        login: LoginHandler = _login_succeeds,
+    ) -> None:
+        """Initialize the client."""
+        super().__init__(device, user_info)
+        self._login = login
+        self.writer = None
+        self.sent: list[dict[str, Any]] = []
+
+    async def connect(self, ip_address: str) -> None:
+        """Log in, then report the status like the login's status request."""
+        self._connecting = True
+        try:
+            self._connect_and_login = await self._login(self.device_id)
+        finally:
+            self._connecting = False
+        if self._connect_and_login:
+            self.status.online = True
+            self.push_status()
+
+    def push_status(self, attrs: dict[str, Any] | None = None) -> None:
+        """Deliver a status frame like the session receive loop does."""
+        self.status.update(attrs or {})
+        if self._status_fresh_cb:
+            self._status_fresh_cb(self.status)
+
+    async def send_action(self, attr: dict[str, Any], method: str) -> None:
+        """Record the action instead of sending it."""
+        self.sent.append(attr)
+
+    async def send_ping_action(self) -> int:
+        """Do not ping."""
+        return 1
+
+    async def reset(self) -> None:
+        """Drop the simulated session."""
+        self._connect_and_login = False
+        self.status.online = False
+
+    async def close(self) -> None:
+        """Close the simulated session."""
+        self._is_close = True
+        await self.reset()
+
+
+class StubCloudClient:
+    """Cloud client serving a fixed device list."""
+
+    def __init__(
+        self,
+        devices: list[dict[str, Any]] | None = None,
+        login: LoginHandler = _login_succeeds,
+    ) -> None:
+        """Initialize the client."""
+        self.login_info: dict[str, Any] = {
+            CONF_ID: USER_ID,
+            CONF_ACCESS_TOKEN: "stub",
+        }
+        self.devices = devices or []
+        self._login = login
+        self._device_clients: dict[str, StubDeviceClient] = {}
+
+    def set_token_fresh_cb(self, callback: Any) -> None:
+        """Ignore token refreshes."""
+
+    async def async_post_login(self) -> dict[str, Any]:
+        """Return the stub login info."""
+        return self.login_info
+
+    async def async_refresh_token(self) -> dict[str, Any]:
+        """Return the stub token."""
+        return self.login_info
+
+    async def async_get_all_device(self) -> dict[str, Any]:
+        """Return the device list."""
+        return {CONF_DEVICE_LIST: self.devices}
+
+    def get_device_client(self, device: dict[str, Any]) -> StubDeviceClient:
+        """Return the stub client of a device."""
+        dev_id = device[CONF_ID]
+        if (device_client := self._device_clients.get(dev_id)) is None:
+            device_client = self._device_clients[dev_id] = StubDeviceClient(
+                device, self.login_info, self._login
+            )
+        return device_client
+
+    async def remove_device_client(self, dev_id: str) -> None:
+        """Close and forget the client of a device."""
+        if (device_client := self._device_clients.pop(dev_id, None)) is not None:
+            await device_client.close()
@@ -0,0 +1,48 @@
+"""Tests for the AiDot config flow."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_COUNTRY_CODE, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from aidot.const import CONF_LOGIN_INFO
+
+from custom_components.aidot.const import DOMAIN
+
+LOGIN_INFO = {"id": "user-1", "accessToken": "token", "username": "user@example.com"}
+
+
+async def test_user_flow(hass: HomeAssistant) -> None:
+    """Create an entry with the login info of the account."""
+    with (
+        patch("aidot.client.AidotClient", autospec=True) as client_class,
+        patch(
+            "custom_components.aidot.async_setup_entry", return_value=True
+        ) as setup_entry,
+    ):
+        client = client_class.return_value
+        client.get_identifier.return_value = "user@example.com-US"
+        client.async_post_login = AsyncMock(return_value=LOGIN_INFO)
+
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_USER}
+        )
+        assert result["type"] is FlowResultType.FORM
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_COUNTRY_CODE: "US",
+                CONF_USERNAME: "user@example.com",
+                CONF_PASSWORD: "secret",
+            },
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"] == {CONF_LOGIN_INFO: LOGIN_INFO}
+    assert client_class.call_args.kwargs["username"] == "user@example.com"
+    assert len(setup_entry.mock_calls) == 1
@@ -0,0 +1,51 @@
+"""Tests for discovery reply offloading."""
+
+from __future__ import annotations
+
+import json
+
+from homeassistant.core import HomeAssistant
+
+from aidot.aes_utils import aes_encrypt
+from aidot.discover import BroadcastProtocol
+
+from custom_components.aidot.crypto import ReplyOffloader
+from custom_components.aidot.device_wrapper import discovery_key
+
+KEY = discovery_key(BroadcastProtocol(None, "stub-user"))
+
+
+def _reply(dev_id: str) -> bytes:
+    """Return an encrypted discovery reply of a device."""
+    message = {"payload": {"devId": dev_id, "mac": "a4:c1:38:00:00:01"}}
+    return aes_encrypt(json.dumps(message).encode(), KEY)
+
+
+async def test_replies_decrypted_inline(hass: HomeAssistant) -> None:
+    """Replies are decrypted on the event loop while that is cheap."""
+    replies: list[tuple[str, dict[str, str]]] = []
+    offloader = ReplyOffloader(hass, lambda *reply: replies.append(reply))
+
+    offloader.handle(_reply("light-a"), "10.0.0.2", KEY)
+    offloader.handle(b"not a reply", "10.0.0.3", KEY)
+
+    assert replies == [("light-a", {"ipAddress": "10.0.0.2"})]
+    assert offloader.offloaded == 0
+
+
+async def test_replies_offloaded_under_load(hass: HomeAssistant) -> None:
+    """Replies are decrypted in batches on the thread pool under load."""
+    replies: list[tuple[str, dict[str, str]]] = []
+    offloader = ReplyOffloader(hass, lambda *reply: replies.append(reply))
+    offloader.offloading = True
+
+    for index in range(200):
+        offloader.handle(_reply(f"light-{index}"), f"10.0.1.{index}", KEY)
+    offloader.handle(b"not a reply", "10.0.0.3", KEY)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(replies) == 200
+    assert replies[0] == ("light-0", {"ipAddress": "10.0.1.0"})
+    assert offloader.offloaded == 201
+    assert offloader.loop_time_saved > 0
+    offloader.shutdown()
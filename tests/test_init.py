@@ -0,0 +1,38 @@
+"""Tests for the AiDot integration package."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+# Modules that must only be imported once an entry is set up
+DEFERRED_MODULES = (
+    "aidot.client",
+    "aidot.discover",
+    "aidot.device_client",
+    "custom_components.aidot.coordinator",
+)
+
+
+def test_import_defers_clients() -> None:
+    """Loading the integration and its config flow leaves the clients unloaded.
+
+    Runs in a fresh interpreter, other tests have already imported the
+    coordinator into this one.
+    """
+    code = (
+        "import json, sys\n"
+        "import custom_components.aidot, custom_components.aidot.config_flow\n"
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout) == []
@@ -0,0 +1,28 @@
+"""Tests for the traffic recorder."""
+
+from __future__ import annotations
+
+from custom_components.aidot.recorder import redact_devices
+
+
+def test_redact_devices() -> None:
+    """Keys, passwords and identifying fields stay out of shared logs."""
+    devices = [
+        {
+            "id": "light-a",
+            "type": "light",
+            "name": "Kitchen",
+            "mac": "a4:c1:38:00:00:01",
+            "aesKey": ["0123456789abcdef"],
+            "password": "device-secret",
+            "product": {"serviceModules": [{"identity": "control.light.cct"}]},
+        }
+    ]
+
+    (redacted,) = redact_devices(devices)
+
+    assert redacted["id"] == "light-a"
+    assert redacted["product"] == devices[0]["product"]
+    for key in ("name", "mac", "aesKey", "password"):
+        assert redacted[key] == "**REDACTED**"
+    assert devices[0]["password"] == "device-secret"
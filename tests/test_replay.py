@@ -0,0 +1,48 @@
+"""Tests for replaying recorded traffic."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from aidot.const import CONF_LOGIN_INFO
+
+from custom_components.aidot.const import DOMAIN
+
+from .replay import ReplayDriver
+from .stubs import USER_ID
+
+TRAFFIC_LOG = Path(__file__).parent / "fixtures" / "traffic.jsonl"
+
+
+async def test_replay_recorded_traffic(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Replay a log without writing its redacted device list to storage."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_LOGIN_INFO: {"id": USER_ID}}
+    )
+    entry.add_to_hass(hass)
+
+    report = await ReplayDriver(hass, entry, TRAFFIC_LOG, speed=100).async_run()
+
+    assert report.events == 9
+    assert report.devices == 2
+    assert report.connection_attempts == 2
+    assert report.connection_failures == 1
+    assert report.commands_failed == 0
+    # light-a disconnected at the end of the log, light-b never logged in
+    assert report.connected == 0
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=10))
+    await hass.async_block_till_done()
+    assert f"{DOMAIN}.{entry.entry_id}.devices" not in hass_storage